@@ -20,11 +20,43 @@ Expected Output: Provides a foundational class for API interaction.
 
 from abc import ABC, abstractmethod
 import requests
+from requests.adapters import HTTPAdapter
 import time
-from typing import Optional, Dict, Any, Tuple
+from typing import Optional, Dict, Any, Tuple, Union
 
 from src.utils.logger import log
 
+# Keep-alive connections kept per host. Sized for the media uploader's concurrent
+# uploads so every worker thread reuses a pooled TLS connection instead of
+# opening (and discarding) its own.
+HTTP_POOL_MAXSIZE = 8
+
+# Rate-limited (429) requests are retried after the server's Retry-After delay, capped here
+MAX_RETRY_AFTER_SECONDS = 60.0
+
+def _retry_after_seconds(response: requests.Response) -> Optional[float]:
+    """
+    Returns the delay requested by a response's Retry-After header, in seconds.
+    Only the delta-seconds form is honoured; a missing or HTTP-date value gives None.
+    """
+    value = response.headers.get('Retry-After')
+    if value is None:
+        return None
+    try:
+        return min(max(float(value), 0.0), MAX_RETRY_AFTER_SECONDS)
+    except ValueError:
+        return None
+
+def _rewind_files(files: Dict[str, Any]) -> None:
+    """
+    Seeks every file object in a requests-style `files` mapping back to the start.
+    A failed attempt leaves them read to the end, so a retry would otherwise send an empty body.
+    """
+    for value in files.values():
+        file_obj = value[1] if isinstance(value, tuple) else value
+        if hasattr(file_obj, 'seek'):
+            file_obj.seek(0)
+
 class BaseApiClient(ABC):
     """
     Abstract base class for API clients.
@@ -49,6 +81,11 @@ class BaseApiClient(ABC):
         self.base_url = base_url.rstrip('/') # Ensure no trailing slash
         self.api_key = api_key
         self.session = requests.Session() # Use a session for potential performance benefits
+        # Reuse connections across all calls of this client (no per-request TCP/TLS handshake).
+        # No urllib3 Retry here: _make_request already implements retries with backoff.
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=HTTP_POOL_MAXSIZE)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
         self.default_timeout = default_timeout
         log.debug(f"{self.__class__.__name__} initialized with base URL: {self.base_url}")
 
@@ -68,7 +105,7 @@ class BaseApiClient(ABC):
         method: str,
         endpoint: str,
         params: Optional[Dict[str, Any]] = None,
-        data: Optional[Dict[str, Any]] = None,
+        data: Optional[Union[Dict[str, Any], bytes]] = None,
         json_payload: Optional[Dict[str, Any]] = None,
         files: Optional[Dict[str, Any]] = None,
         headers: Optional[Dict[str, str]] = None,
@@ -83,12 +120,12 @@ class BaseApiClient(ABC):
             method (str): HTTP method (e.g., 'GET', 'POST').
             endpoint (str): API endpoint path (relative to base_url).
             params (Optional[Dict[str, Any]]): URL parameters.
-            data (Optional[Dict[str, Any]]): Form data payload.
+            data (Optional[Union[Dict[str, Any], bytes]]): Form data payload, or a pre-encoded request body.
             json_payload (Optional[Dict[str, Any]]): JSON payload.
             files (Optional[Dict[str, Any]]): Files to upload.
             headers (Optional[Dict[str, str]]): Custom headers.
             timeout (Optional[int]): Request timeout in seconds. Overrides default.
-            retries (int): Number of times to retry on failure.
+            retries (int): Number of times to retry on failure (timeouts, connection errors, 5xx and 429).
             backoff_factor (float): Factor to determine delay between retries (delay = backoff_factor * (2 ** retry_attempt)).
 
         Returns:
@@ -109,11 +146,16 @@ class BaseApiClient(ABC):
         # merged_headers.update(auth_headers)
 
         last_exception = None
+        retry_after: Optional[float] = None
 
         for attempt in range(retries + 1):
+            retry_after = None
+            if attempt > 0 and files:
+                _rewind_files(files)
             try:
-                log.debug(f"Request Attempt {attempt + 1}/{retries + 1}: {method} {url}")
-                log.debug(f"Params: {params}, JSON: {json_payload}, Data: {data}, Files: {files is not None}")
+                log.debug("Request Attempt %d/%d: %s %s", attempt + 1, retries + 1, method, url)
+                # Lazy args: the payload (a whole article for drafts) is only formatted when DEBUG is on
+                log.debug("Params: %s, JSON: %s, Data: %s, Files: %s", params, json_payload, data, files is not None)
 
                 response = self.session.request(
                     method=method.upper(),
@@ -148,8 +190,11 @@ class BaseApiClient(ABC):
             except requests.exceptions.HTTPError as e:
                 last_exception = e
                 log.error(f"HTTP error: {e.response.status_code} {e.response.reason} - {e.response.text}")
-                # Stop retrying on client errors (4xx) unless specifically designed otherwise
-                if 400 <= e.response.status_code < 500:
+                if e.response.status_code == 429:
+                    # Rate limited: transient, so retry, waiting as long as the server asks
+                    retry_after = _retry_after_seconds(e.response)
+                # Stop retrying on other client errors (4xx) unless specifically designed otherwise
+                elif 400 <= e.response.status_code < 500:
                      # Check specific WeChat/DeepSeek error codes within response text/json if needed
                     return None, f"HTTP {e.response.status_code}: {e.response.text}"
             except requests.exceptions.RequestException as e:
@@ -159,6 +204,8 @@ class BaseApiClient(ABC):
             # If it's not the last attempt, wait before retrying
             if attempt < retries:
                 delay = backoff_factor * (2 ** attempt)
+                if retry_after is not None:
+                    delay = max(delay, retry_after)
                 log.info(f"Retrying in {delay:.2f} seconds...")
                 time.sleep(delay)
 
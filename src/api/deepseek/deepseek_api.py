@@ -8,6 +8,7 @@ Provides methods to interact with the DeepSeek API, specifically for
 generating text summaries based on input content.
 
 Dependencies:
+- re (standard Python library)
 - typing (standard Python library)
 - src.api.base_client.BaseApiClient
 - src.core.settings
@@ -17,6 +18,7 @@ Expected Input: Requires DeepSeek API Key configured in settings.
 Expected Output: Methods return generated text (summary) or None on failure.
 """
 
+import re
 from typing import Optional, Dict, Any, List, Tuple
 
 from src.api.base_client import BaseApiClient
@@ -26,6 +28,25 @@ from src.utils.logger import log
 # DeepSeek API Endpoints (Consult DeepSeek documentation for specifics)
 ENDPOINT_CHAT_COMPLETIONS = '/v1/chat/completions'
 
+# Input characters sent per text to summarize
+SUMMARY_INPUT_LIMIT = 4000
+
+DEFAULT_SUMMARY_INSTRUCTION = (
+    "Please generate a concise and engaging summary of the following text, suitable for a WeChat article abstract. "
+    "The summary should capture the main points and be approximately 50-120 characters long. "
+    "Focus on the key message or takeaway."
+    # " Ensure the summary does not exceed 120 characters." # Note: Character limits are hard for LLMs, token limits are better control.
+)
+
+# Batched summaries: each text (and each summary in the reply) is introduced by this header line
+BATCH_ITEM_HEADER = "### Item {index}"
+BATCH_ITEM_HEADER_RE = re.compile(r'^[ \t]*#{1,6}[ \t]*Item[ \t]+(\d+)[ \t]*:?[ \t]*$', re.MULTILINE | re.IGNORECASE)
+BATCH_INSTRUCTION_SUFFIX = (
+    " You will receive several texts, each introduced by a line '### Item N'. "
+    "Summarize each text separately. Reply with one summary per text, each introduced by the same "
+    "'### Item N' line, in the same order, and nothing else."
+)
+
 class DeepSeekClient(BaseApiClient):
     """
     Client for interacting with the DeepSeek API (specifically Chat Completions).
@@ -71,18 +92,12 @@ class DeepSeekClient(BaseApiClient):
             log.warning("Cannot generate summary for empty text content.")
             return None
 
-        default_instruction = (
-            "Please generate a concise and engaging summary of the following text, suitable for a WeChat article abstract. "
-            "The summary should capture the main points and be approximately 50-120 characters long. "
-            "Focus on the key message or takeaway."
-            # " Ensure the summary does not exceed 120 characters." # Note: Character limits are hard for LLMs, token limits are better control.
-        )
-        prompt_instruction = instruction if instruction else default_instruction
+        prompt_instruction = instruction if instruction else DEFAULT_SUMMARY_INSTRUCTION
 
         # Construct the messages payload for the Chat API
         messages = [
             {"role": "system", "content": prompt_instruction},
-            {"role": "user", "content": text_content[:4000]} # Limit input length if necessary
+            {"role": "user", "content": text_content[:SUMMARY_INPUT_LIMIT]} # Limit input length if necessary
         ]
 
         payload = {
@@ -94,7 +109,7 @@ class DeepSeekClient(BaseApiClient):
         }
 
         log.info(f"Requesting summary from DeepSeek model {self.model}...")
-        log.debug(f"DeepSeek Payload: {payload}")
+        log.debug("DeepSeek Payload: %s", payload)
 
         response_data, error = self._make_request(
             'POST',
@@ -121,4 +136,78 @@ class DeepSeekClient(BaseApiClient):
             return summary
         except (KeyError, IndexError, TypeError) as e:
             log.error(f"Failed to parse summary from DeepSeek response: {e}. Response: {response_data}")
-            return None
\ No newline at end of file
+            return None
+
+    def generate_summaries_batch(self, text_contents: List[str], max_tokens_per_item: int = 150, instruction: Optional[str] = None) -> List[Optional[str]]:
+        """
+        Generates summaries for several texts with a single DeepSeek Chat API request.
+        The texts are sent as '### Item N' sections and the reply is split on the same headers.
+
+        Args:
+            text_contents (List[str]): The texts to summarize.
+            max_tokens_per_item (int): The token budget per summary (the request gets N times this).
+            instruction (Optional[str]): An optional specific instruction for the summarization task.
+
+        Returns:
+            List[Optional[str]]: One summary per input text, in order; None where an input was
+                                 empty or its summary is missing from the reply (or the request failed).
+        """
+        summaries: List[Optional[str]] = [None] * len(text_contents)
+        indexes = [i for i, text in enumerate(text_contents) if text]
+        if not indexes:
+            if text_contents:
+                log.warning("Cannot generate summaries: all text contents are empty.")
+            return summaries
+        if len(indexes) == 1: # Nothing to batch
+            summaries[indexes[0]] = self.generate_summary(text_contents[indexes[0]], max_tokens=max_tokens_per_item, instruction=instruction)
+            return summaries
+
+        prompt_instruction = (instruction if instruction else DEFAULT_SUMMARY_INSTRUCTION) + BATCH_INSTRUCTION_SUFFIX
+        user_content = "\n\n".join(
+            f"{BATCH_ITEM_HEADER.format(index=item_number)}\n{text_contents[i][:SUMMARY_INPUT_LIMIT]}"
+            for item_number, i in enumerate(indexes, start=1)
+        )
+        payload = {
+            "model": self.model,
+            "messages": [
+                {"role": "system", "content": prompt_instruction},
+                {"role": "user", "content": user_content}
+            ],
+            "max_tokens": max_tokens_per_item * len(indexes),
+            "temperature": 0.7,
+            "stream": False
+        }
+
+        log.info(f"Requesting {len(indexes)} summaries in one batch from DeepSeek model {self.model}...")
+        response_data, error = self._make_request(
+            'POST',
+            ENDPOINT_CHAT_COMPLETIONS,
+            json_payload=payload
+        )
+
+        if error or not response_data:
+            log.error(f"Failed to generate batch summaries using DeepSeek. Error: {error or 'No data received'}")
+            return summaries
+        if response_data.get('error'):
+            log.error(f"DeepSeek API error: {response_data.get('error')}")
+            return summaries
+
+        try:
+            reply = response_data['choices'][0]['message']['content']
+        except (KeyError, IndexError, TypeError) as e:
+            log.error(f"Failed to parse batch summaries from DeepSeek response: {e}. Response: {response_data}")
+            return summaries
+
+        # re.split with one group yields [preamble, number, text, number, text, ...]
+        parts = BATCH_ITEM_HEADER_RE.split(reply)
+        for number_str, summary_text in zip(parts[1::2], parts[2::2]):
+            item_number = int(number_str)
+            summary_text = summary_text.strip().strip('"\'')
+            if 1 <= item_number <= len(indexes) and summary_text:
+                summaries[indexes[item_number - 1]] = summary_text
+
+        missing_count = sum(1 for i in indexes if summaries[i] is None)
+        if missing_count:
+            log.warning(f"DeepSeek batch reply is missing {missing_count} of {len(indexes)} summaries.")
+        log.info(f"Generated {len(indexes) - missing_count} of {len(indexes)} summaries in one batch.")
+        return summaries
@@ -9,6 +9,10 @@ including fetching access tokens, uploading media, and managing drafts.
 
 Dependencies:
 - time (standard Python library)
+- json (standard Python library)
+- logging (standard Python library)
+- threading (standard Python library)
+- os (standard Python library)
 - typing (standard Python library)
 - src.api.base_client.BaseApiClient
 - src.core.settings
@@ -18,8 +22,11 @@ Expected Input: Requires WeChat App ID and Secret configured in settings.
 Expected Output: Methods return data from WeChat API or raise exceptions on failure.
 """
 
+import os
 import time
 import json
+import logging
+import threading
 from typing import Optional, Dict, Any, Tuple
 
 from src.api.base_client import BaseApiClient
@@ -37,6 +44,30 @@ ENDPOINT_UPDATE_DRAFT = '/cgi-bin/draft/update'
 ENDPOINT_BATCHGET_MATERIAL = '/cgi-bin/material/batchget_material' # To check existing permanent media? maybe less useful for drafts
 ENDPOINT_BATCHGET_DRAFT = '/cgi-bin/draft/batchget' # To list drafts for idempotency
 
+# Read buffer for media files being uploaded (media is typically 100 KB - 10 MB)
+UPLOAD_READ_BUFFER_SIZE = 256 * 1024
+
+# Draft bodies are sent as raw UTF-8 JSON: requests' json= escapes every non-ASCII
+# character to \uXXXX (6 bytes instead of 3 for CJK text), and WeChat stores them verbatim.
+JSON_UTF8_HEADERS = {'Content-Type': 'application/json; charset=utf-8'}
+
+def _encode_json_body(payload: Dict[str, Any]) -> bytes:
+    """Serializes a request payload once into compact UTF-8 JSON bytes."""
+    return json.dumps(payload, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+def _advise_sequential_read(file_obj) -> None:
+    """
+    Hints the kernel that the whole file is about to be read front to back, so it can
+    read ahead while the upload request is being built. Best effort: platforms without
+    posix_fadvise (or non-regular files) simply skip the hint.
+    """
+    if not hasattr(os, 'posix_fadvise'):
+        return
+    try:
+        os.posix_fadvise(file_obj.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+    except Exception as e: # Advisory only; never fail an upload over it
+        log.debug(f"posix_fadvise hint skipped: {e}")
+
 class WeChatClient(BaseApiClient):
     """
     Client for interacting with the WeChat Official Account API.
@@ -53,6 +84,8 @@ class WeChatClient(BaseApiClient):
         self.app_secret = settings.WECHAT_APP_SECRET
         self._access_token: Optional[str] = None
         self._token_expiry_time: float = 0.0
+        # Serializes token refreshes when media is uploaded from several threads
+        self._token_lock = threading.Lock()
         log.info("WeChatClient initialized.")
 
     def _authenticate(self) -> Dict[str, Any]:
@@ -62,10 +95,13 @@ class WeChatClient(BaseApiClient):
         It's called implicitly by methods needing the token.
         """
         if not self._access_token or time.time() >= self._token_expiry_time:
-            log.info("Access token is invalid or expired. Fetching new token...")
-            if not self._fetch_access_token():
-                # Error already logged in _fetch_access_token
-                raise ConnectionError("Failed to retrieve WeChat access token.")
+            with self._token_lock:
+                # Re-check: another thread may have refreshed the token while we waited
+                if not self._access_token or time.time() >= self._token_expiry_time:
+                    log.info("Access token is invalid or expired. Fetching new token...")
+                    if not self._fetch_access_token():
+                        # Error already logged in _fetch_access_token
+                        raise ConnectionError("Failed to retrieve WeChat access token.")
         # Return empty dict as token is added to params, not headers usually
         return {}
 
@@ -133,7 +169,8 @@ class WeChatClient(BaseApiClient):
         params = {'access_token': access_token, 'type': media_type}
 
         try:
-            with open(file_path, 'rb') as f:
+            with open(file_path, 'rb', buffering=UPLOAD_READ_BUFFER_SIZE) as f:
+                _advise_sequential_read(f)
                 files = {'media': (file_path, f)} # Let requests handle Content-Type
                 # For permanent video uploads, a description JSON might be needed in `data`
                 # data = None
@@ -200,10 +237,13 @@ class WeChatClient(BaseApiClient):
         params = {'access_token': access_token}
         payload = {'articles': [article_data]} # API expects a list of articles
 
+        body = _encode_json_body(payload)
+
         log.info(f"Attempting to add new draft: Title '{article_data.get('title', 'N/A')}'")
-        log.debug(f"Draft payload: {json.dumps(payload, ensure_ascii=False)}") # Log full payload in debug
+        if log.isEnabledFor(logging.DEBUG): # Log full payload in debug, reusing the encoded body
+            log.debug("Draft payload: %s", body.decode('utf-8'))
 
-        response_data, error = self._make_request('POST', endpoint, params=params, json_payload=payload)
+        response_data, error = self._make_request('POST', endpoint, params=params, data=body, headers=JSON_UTF8_HEADERS)
 
         if error or not response_data:
             log.error(f"Failed to add draft. Error: {error or 'No data received'}")
@@ -245,10 +285,13 @@ class WeChatClient(BaseApiClient):
             "articles": article_data # API expects the article structure directly
         }
 
+        body = _encode_json_body(payload)
+
         log.info(f"Attempting to update draft {draft_media_id} at index {article_index}: Title '{article_data.get('title', 'N/A')}'")
-        log.debug(f"Update Draft payload: {json.dumps(payload, ensure_ascii=False)}")
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug("Update Draft payload: %s", body.decode('utf-8'))
 
-        response_data, error = self._make_request('POST', endpoint, params=params, json_payload=payload)
+        response_data, error = self._make_request('POST', endpoint, params=params, data=body, headers=JSON_UTF8_HEADERS)
 
         # Update API typically returns {"errcode":0,"errmsg":"ok"} on success
         if error:
@@ -9,16 +9,24 @@ in a structured way, separating content from presentation concerns.
 
 Dependencies:
 - dataclasses (standard Python library)
+- functools (standard Python library)
+- sys (standard Python library)
 - typing (standard Python library)
 
 Expected Input: Data extracted from Markdown parsing.
 Expected Output: Instances of Article and potentially related data classes.
 """
 
+import sys
 from dataclasses import dataclass, field
-from typing import List, Optional, Dict, Any
+from functools import cached_property
+from typing import List, Optional, Dict, Any, NamedTuple
 
-@dataclass
+# Per-item classes are created in bulk while parsing; __slots__ drops the per-instance
+# __dict__. dataclass(slots=True) only exists on Python 3.10+, so older versions fall back.
+_SLOTS = {'slots': True} if sys.version_info >= (3, 10) else {}
+
+@dataclass(**_SLOTS)
 class MediaPlaceholder:
     """Represents a placeholder for media found in the Markdown."""
     original_tag: str  # e.g., ![alt text](placeholder:image_name.jpg)
@@ -31,7 +39,7 @@ class MediaPlaceholder:
     uploaded_media_id: Optional[str] = None
     uploaded_url: Optional[str] = None # Permanent media URL from WeChat
 
-@dataclass
+@dataclass(**_SLOTS)
 class ContentElement:
     """Represents a block of content (paragraph, header, list, etc.)."""
     # Using a generic structure for simplicity. Could be more specific (e.g., HeaderElement, ParagraphElement).
@@ -40,6 +48,27 @@ class ContentElement:
     # Or, store pre-rendered HTML segment directly if easier for templating
     html_content: Optional[str] = None
 
+def _block_text(content: Any) -> List[str]:
+    return [str(content)]
+
+def _list_items_text(content: Any) -> List[str]:
+    return [f"- {item}" for item in content] if isinstance(content, list) else []
+
+# ContentElement.type -> text extractor used by Article.get_content_as_text (one dict lookup per element)
+_TEXT_EXTRACTORS = {
+    **{f'h{level}': _block_text for level in range(1, 7)},
+    'p': _block_text,
+    'ul': _list_items_text,
+    'ol': _list_items_text,
+}
+
+class MediaColumns(NamedTuple):
+    """Column-wise (struct-of-arrays) view of an article's media placeholders; index i is one placeholder."""
+    ids: List[str]
+    paths: List[Optional[str]]
+    types: List[str]
+    alts: List[str]
+
 @dataclass
 class Article:
     """
@@ -72,26 +101,45 @@ class Article:
              return self.cover_image_placeholder
         return None
 
+    @cached_property
+    def media_soa(self) -> MediaColumns:
+        """
+        Parallel lists of placeholder IDs, file paths, media types and alt texts,
+        for loops that only need one or two attributes (e.g. filtering by type).
+        Built on first access and cached; media_placeholders should be complete by then.
+        """
+        placeholders = self.media_placeholders
+        return MediaColumns(
+            ids=[p.placeholder_id for p in placeholders],
+            paths=[p.file_path for p in placeholders],
+            types=[p.media_type for p in placeholders],
+            alts=[p.alt_text for p in placeholders],
+        )
+
     def get_content_as_text(self) -> str:
         """
         Provides a simple text representation of the article content,
         useful for feeding into summary generation. Strips HTML/Markdown.
         This is a basic implementation.
         """
-        text_parts = []
+        lines: List[str] = []
+        add_line = lines.append
         for element in self.content_elements:
-            if element.type.startswith('h'):
-                text_parts.append(str(element.content))
-            elif element.type == 'p':
-                 text_parts.append(str(element.content))
-            elif element.type in ['ul', 'ol']:
-                 if isinstance(element.content, list):
-                     text_parts.extend([f"- {item}" for item in element.content])
+            extract = _TEXT_EXTRACTORS.get(element.type)
+            if extract is not None:
+                parts = extract(element.content)
             elif isinstance(element.content, str): # Fallback for simple string content
-                 text_parts.append(element.content)
+                parts = (element.content,)
+            else:
+                continue
             # Add more sophisticated stripping logic if needed (e.g., remove code blocks)
 
-        full_text = "\n".join(text_parts)
-        # Basic cleanup (replace multiple newlines/spaces) - needs refinement
-        full_text = "\n".join(line.strip() for line in full_text.splitlines() if line.strip())
-        return full_text
\ No newline at end of file
+            # Basic cleanup while collecting: keep stripped, non-empty lines only, so the
+            # text is built with a single final join
+            for part in parts:
+                for line in part.splitlines():
+                    line = line.strip()
+                    if line:
+                        add_line(line)
+
+        return "\n".join(lines)
\ No newline at end of file
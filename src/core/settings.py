@@ -143,6 +143,13 @@ WECHAT_APP_ID = os.getenv('WECHAT_APP_ID')
 WECHAT_APP_SECRET = os.getenv('WECHAT_APP_SECRET')
 # Get BaseUrl from config, fallback to default
 WECHAT_API_BASE_URL = get_config_value('WeChatAPI', 'BaseUrl', default='https://api.weixin.qq.com')
+# Number of content media files uploaded at once per article
+upload_concurrency_str = get_config_value('WeChatAPI', 'UploadConcurrency', default='4')
+try:
+    WECHAT_UPLOAD_CONCURRENCY = max(1, int(upload_concurrency_str))
+except ValueError:
+    log.warning(f"Invalid [WeChatAPI] UploadConcurrency '{upload_concurrency_str}', using default: 4")
+    WECHAT_UPLOAD_CONCURRENCY = 4
 
 # DeepSeek API Settings (Prioritize Environment Variables)
 DEEPSEEK_API_KEY = os.getenv('DEEPSEEK_API_KEY')
@@ -191,6 +198,9 @@ ENABLE_APPRECIATION = enable_appreciation_str.lower() == 'true'
 enable_platform_rec_str = get_config_value('PublishingDefaults', 'EnablePlatformRecommendation', default='true')
 ENABLE_PLATFORM_RECOMMENDATION = enable_platform_rec_str.lower() == 'true'
 
+enable_comments_str = get_config_value('PublishingDefaults', 'EnableComments', default='true')
+ENABLE_COMMENTS = enable_comments_str.lower() == 'true'
+
 # Media Handling Mode (from config with default)
 MEDIA_HANDLING_MODE = get_config_value('Media', 'Mode', default='pre-prepared').lower()
 
@@ -36,15 +36,10 @@ from pathlib import Path
 from typing import Optional
 
 # --- Core Application Imports ---
-# Logger is initialized here, settings loaded on import
+# Only the logger is imported eagerly. Settings, API clients and services pull in
+# requests/openai/markdown and are imported inside run_workflow, so `--help` and
+# argument errors return without loading them.
 from src.utils.logger import log, setup_logger
-from src.core import settings
-from src.core.article_model import Article
-from src.parsing.md_parser import MarkdownParser
-from src.api.wechat.client import WeChatClient
-from src.api.deepseek.deepseek_api import DeepSeekClient
-from src.platforms.wechat.media_uploader import WeChatMediaUploader
-from src.platforms.wechat.publisher import WeChatPublisher
 
 def run_workflow(markdown_path: Path, check_existing_draft: bool):
     """
@@ -57,6 +52,16 @@ def run_workflow(markdown_path: Path, check_existing_draft: bool):
     Returns:
         bool: True if the workflow completed successfully (draft published), False otherwise.
     """
+    from src.core import settings
+    from src.core.article_model import Article
+    from src.parsing.md_parser import MarkdownParser
+    from src.api.wechat.client import WeChatClient
+    from src.api.deepseek.deepseek_api import DeepSeekClient
+    from src.platforms.wechat.media_uploader import WeChatMediaUploader
+    from src.platforms.wechat.publisher import WeChatPublisher
+
+    log.info(f"Media Handling Mode: {settings.MEDIA_HANDLING_MODE}")
+
     # --- Initialize Clients and Services ---
     # Declare variables outside try block for finally clause access
     wechat_client: Optional[WeChatClient] = None
@@ -147,10 +152,9 @@ def run_workflow(markdown_path: Path, check_existing_draft: bool):
 def main():
     """Main execution function: parses arguments and calls the workflow."""
     # --- Argument Parsing and Logging Setup ---
+    setup_logger() # Attach the console handler once, before anything is logged
     log.info("=================================================")
     log.info("Starting WeChat Auto Publisher Workflow")
-    log.info(f"Media Handling Mode: {settings.MEDIA_HANDLING_MODE}")
-    log.info(f"Current Time (UTC): {log.handlers[0].formatter.converter(None)}")  # Log timestamp format info
     log.info("=================================================")
 
     parser = argparse.ArgumentParser(description="Parse Markdown and publish to WeChat drafts.")
@@ -183,12 +187,8 @@ def main():
     log_level_name = args.log_level.upper()
     log_level = getattr(logging, log_level_name, None)
     if isinstance(log_level, int):
-         # Get the specific logger instance returned by setup_logger and set its level
-         app_logger = logging.getLogger('wechat_publisher')  # Use the name defined in logger.py
-         app_logger.setLevel(log_level)
-         # Also set level on handlers if needed, though setting logger level is usually enough
-         for handler in app_logger.handlers:
-              handler.setLevel(log_level)
+         # Handlers from setup_logger carry no level of their own, so the logger level governs
+         logging.getLogger('wechat_publisher').setLevel(log_level)  # Use the name defined in logger.py
          log.info(f"Logging level set to: {log_level_name}")
     else:
         log.warning(f"Invalid log level specified: {args.log_level}. Using default INFO.")
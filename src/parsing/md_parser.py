@@ -12,7 +12,12 @@ Article data model.
 Dependencies:
 - frontmatter (external library)
 - markdown (external library) - Potentially with extensions
+- os (standard Python library)
+- posixpath (standard Python library)
 - re (standard Python library)
+- re2 (optional, google-re2) - Linear-time engine for the media scan
+- functools (standard Python library)
+- concurrent.futures (standard Python library)
 - typing (standard Python library)
 - pathlib (standard Python library)
 - src.core.article_model
@@ -23,29 +28,67 @@ Expected Input: Path to a Markdown file, potentially containing YAML frontmatter
 Expected Output: An instance of the Article data model populated with metadata and content.
 """
 
+import os
+import posixpath
 import re
 import markdown
+from functools import lru_cache
+from concurrent.futures import ProcessPoolExecutor
 import frontmatter # For parsing YAML frontmatter
 from pathlib import Path
-from typing import Optional, List, Dict, Any, Tuple
+from typing import Optional, List, Dict, Any, Tuple, Iterable
 
 from src.core.article_model import Article, ContentElement, MediaPlaceholder
 from src.core import settings # Need settings for INPUT_DIR comparison
 from src.utils.logger import log
 
-# Regex to find the first H1 header (fallback title)
-TITLE_RE = re.compile(r"^\s*#\s+(.+)\s*$", re.MULTILINE)
+# Optional: google-re2 (pip install 'auto-work-publishment-for-wechat-article[re2]')
+# gives the media scan linear-time matching on large or untrusted input.
+try:
+    import re2  # type: ignore
+except ImportError:
+    re2 = None
 
-# Regex to find custom media placeholders like ![alt](placeholder:id)
-CUSTOM_MEDIA_PLACEHOLDER_RE = re.compile(r'!\[(.*?)\]\(placeholder:(.*?)\)')
+# Regex to find both custom media placeholders like ![alt](placeholder:id) and
+# standard Markdown image links like ![alt text](path/to/image.ext) in one pass.
+# Exactly one of the 'pid' (custom) or 'path' (standard) groups participates per match.
+# Surrounding whitespace is consumed by the pattern, so the groups come out already trimmed.
+# An optional Markdown link title (![alt](path "Title")) is captured separately in 'title'.
+MEDIA_PATTERN = (
+    r'!\[\s*(?P<alt>.*?)\s*\]\(\s*(?:placeholder:\s*(?P<pid>.*?)|(?P<path>.*?))'
+    r'(?:\s+(?P<title>"[^"]*"|\'[^\']*\'))?\s*\)'
+)
+MEDIA_RE = re2.compile(MEDIA_PATTERN) if re2 is not None else re.compile(MEDIA_PATTERN)
 
-# Regex to find standard Markdown image links: ![alt text](path/to/image.ext)
-# It should *not* match the custom placeholders.
-STANDARD_IMAGE_RE = re.compile(r'!\[(?P<alt>.*?)\]\((?P<path>(?!placeholder:).*?)\)')
+# MEDIA_RE fused with a zero-width branch capturing the first H1 header (fallback title),
+# so the title and the media references come out of the same scan. The lookahead keeps
+# any media tag on the heading line itself matchable by the media branch.
+# Always compiled with `re`: RE2 does not support lookaheads.
+TITLE_OR_MEDIA_RE = re.compile(r'^(?=[ \t]*#[ \t]+(?P<h1>\S.*?)[ \t]*$)|' + MEDIA_PATTERN, re.MULTILINE)
+
+# The fallback H1 title is only taken from the start of the document (first 4 KiB)
+TITLE_SEARCH_LIMIT = 4096
+
+# Video extensions (for simple type detection; anything else is treated as an image)
+VIDEO_EXTENSIONS = frozenset({'.mp4', '.mov', '.avi', '.wmv', '.mkv'})  # add more as needed
+
+# Frontmatter keys consumed by the parser itself; everything else is kept as custom metadata
+_RESERVED_METADATA_KEYS = frozenset({'title', 'author', 'cover_image', 'cover_image_path'})
+
+
+def _placeholder_id_for_path(path: str) -> str:
+    """
+    Placeholder ID for a standard image link: the normalized relative path, so files that
+    share a name in different directories (img/x.png, other/x.png) get distinct IDs.
+    """
+    return posixpath.normpath(path.replace('\\', '/'))
+
+
+@lru_cache(maxsize=64)
+def _media_type_for_suffix(suffix: str) -> str:
+    """Maps a lowercase file suffix to a media type (image/video); cached per suffix."""
+    return "video" if suffix in VIDEO_EXTENSIONS else "image"  # Default to image if extension unknown/missing
 
-# Allowed image/video extensions (for simple type detection)
-MEDIA_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.gif', '.bmp', '.webp', '.svg', # images
-                    '.mp4', '.mov', '.avi', '.wmv', '.mkv'} # videos (add more as needed)
 
 class MarkdownParser:
     """Parses Markdown files with frontmatter into a structured Article object."""
@@ -60,38 +103,84 @@ class MarkdownParser:
                                     Consider making this configurable via settings.py.
         """
         self.extensions = extensions if extensions else ['extra', 'fenced_code', 'tables', 'sane_lists']
+        # Build the converter (extensions, internal regexes) once; reset() between files.
+        self._md = markdown.Markdown(extensions=self.extensions, output_format='html')
         log.info(f"MarkdownParser initialized with extensions: {self.extensions}")
 
-    def parse_file(self, file_path: Path) -> Optional[Article]:
+    def __getstate__(self) -> Dict[str, Any]:
+        """Pickles only the configuration; the converter is rebuilt in the receiving process."""
+        state = self.__dict__.copy()
+        state.pop('_md', None)
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._md = markdown.Markdown(extensions=self.extensions, output_format='html')
+
+    def parse_files(self, file_paths: Iterable[Path], workers: Optional[int] = None) -> List[Optional[Article]]:
+        """
+        Parses several Markdown files, spreading them over worker processes.
+
+        Args:
+            file_paths (Iterable[Path]): The Markdown files to parse.
+            workers (Optional[int]): Maximum number of worker processes.
+                                     Defaults to the CPU count; 1 parses in-process.
+
+        Returns:
+            List[Optional[Article]]: One result per input path, in input order
+                                     (None where parse_file failed).
+        """
+        file_paths = list(file_paths)
+        if workers == 1 or len(file_paths) <= 1:
+            # Not worth a process pool: parse sequentially with this parser
+            return [self.parse_file(path) for path in file_paths]
+
+        log.info(f"Parsing {len(file_paths)} Markdown files in parallel (workers={workers or 'auto'}).")
+        try:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                return list(executor.map(self.parse_file, file_paths))
+        except Exception as e:
+            log.error(f"Parallel parsing failed ({e}). Falling back to sequential parsing.")
+            return [self.parse_file(path) for path in file_paths]
+
+    def parse_file(self, file_path: Path, keep_raw: bool = False) -> Optional[Article]:
         """
         Parses a single Markdown file, including YAML frontmatter.
 
         Args:
             file_path (Path): The path to the Markdown file.
+            keep_raw (bool): Keep the raw Markdown body on Article.raw_markdown.
+                             Off by default so only the HTML stays resident.
 
         Returns:
             Optional[Article]: An Article object if parsing is successful, None otherwise.
         """
-        if not file_path.is_file():
-            log.error(f"Markdown input file not found or is not a file: {file_path}")
-            return None
-
         log.info(f"Starting parsing of Markdown file: {file_path}")
         try:
-            # Load the file, separating frontmatter (metadata) and content
-            post = frontmatter.load(file_path, encoding='utf-8')
+            # Load the file, separating frontmatter (metadata) and content.
+            # No separate existence check: opening the file is the check (one syscall, no race).
+            # Read the whole file in one call and decode the contiguous buffer in one go.
+            post = frontmatter.loads(file_path.read_bytes().decode('utf-8'))
             metadata: Dict[str, Any] = post.metadata
             raw_content: str = post.content
-            log.debug(f"Successfully loaded frontmatter. Metadata keys: {list(metadata.keys())}")
+            log.debug("Successfully loaded frontmatter. Metadata keys: %s", list(metadata))
+        except (FileNotFoundError, IsADirectoryError):
+            log.error(f"Markdown input file not found or is not a file: {file_path}")
+            return None
         except Exception as e:
             log.error(f"Error reading or parsing frontmatter/content from {file_path}: {e}")
             return None
 
         # --- Extract Metadata ---
-        # Prioritize frontmatter, then H1, then filename for title
+        # Prioritize frontmatter, then H1, then filename for title.
+        # The H1 is only looked for when needed, in the same pass that identifies
+        # media placeholders (custom placeholders and standard Markdown images).
+        # The cheap '#' membership test skips the title branch when no heading can exist.
         title = metadata.get('title')
+        find_title = not title and '#' in raw_content
+        h1_title, media_placeholders, markdown_body = self._scan_content(raw_content, find_title=find_title)
         if not title:
-            title = self._extract_h1_title(raw_content)
+            title = h1_title
             if title:
                 log.info("Using H1 header as title (no 'title' in frontmatter).")
             else:
@@ -103,7 +192,7 @@ class MarkdownParser:
         if not author:
             author = settings.ARTICLE_AUTHOR  # If author is missing, fallback to settings' default author
 
-        custom_meta = {k: v for k, v in metadata.items() if k not in ['title', 'author', 'cover_image', 'cover_image_path']}  # Store other metadata
+        custom_meta = {k: v for k, v in metadata.items() if k not in _RESERVED_METADATA_KEYS}  # Store other metadata
 
         # --- Identify Cover Image (from Frontmatter) ---
         cover_image_placeholder_id = metadata.get('cover_image')  # Expects a placeholder ID
@@ -125,7 +214,7 @@ class MarkdownParser:
             # Store the path; uploader will resolve and use it
             article_cover_path = cover_image_path_str
             # Optionally create a placeholder too, using filename as ID?
-            cover_filename = Path(cover_image_path_str).name
+            cover_filename = os.path.basename(cover_image_path_str)
             article_cover_placeholder = MediaPlaceholder(
                 original_tag=f"frontmatter:cover_image_path:{cover_image_path_str}",
                 placeholder_id=cover_filename,  # Use filename as ID
@@ -136,14 +225,11 @@ class MarkdownParser:
         else:
             log.warning(f"No 'cover_image' (placeholder ID) or 'cover_image_path' found in frontmatter for {file_path.name}. Cover image must be handled manually or by convention in uploader.")
 
-        # --- Identify Media Placeholders in Content ---
-        # Combine custom placeholders and standard Markdown images found
-        media_placeholders = self._extract_media_placeholders(raw_content, file_path.parent)
-
         # --- Convert Markdown Content to HTML ---
+        # Uses the scanned body, where local image links already point at `placeholder:<relative path>`
         try:
-            html_content = markdown.markdown(raw_content, extensions=self.extensions)
-            log.debug(f"Markdown content converted to HTML for {file_path.name}")
+            html_content = self._md.reset().convert(markdown_body)
+            log.debug("Markdown content converted to HTML for %s", file_path.name)
         except Exception as e:
             log.error(f"Error converting Markdown content to HTML for {file_path.name}: {e}")
             return None  # Cannot proceed without HTML content
@@ -154,7 +240,7 @@ class MarkdownParser:
             title=title,
             content_elements=content_elements,
             media_placeholders=media_placeholders,
-            raw_markdown=raw_content,  # Keep raw MD content if needed
+            raw_markdown=raw_content if keep_raw else None,  # Keep raw MD content only on request
             metadata={**custom_meta, 'author': author},  # Combine custom meta with author
             cover_image_placeholder=article_cover_placeholder,
             cover_image_file_path=article_cover_path  # This is the *relative* path string from frontmatter
@@ -163,52 +249,103 @@ class MarkdownParser:
         log.info(f"Successfully parsed Markdown file: '{file_path.name}'. Title: '{article.title}'. Found {len(media_placeholders)} content media references.")
         return article
 
-    def _extract_h1_title(self, text: str) -> Optional[str]:
-        """Extracts the first H1 header as the title."""
-        match = TITLE_RE.search(text)
-        if match:
-            title = match.group(1).strip()
-            log.debug(f"Extracted H1 title: '{title}'")
-            return title
-        return None
-
     def _get_media_type_from_path(self, path_str: str) -> str:
          """Determines media type (image/video) based on file extension."""
-         ext = Path(path_str).suffix.lower()
-         if ext in MEDIA_EXTENSIONS:
-             # Basic check, could be refined (e.g., differentiate thumb/image if needed)
-             return "video" if any(path_str.lower().endswith(vidext) for vidext in ['.mp4', '.mov', '.avi']) else "image"
-         return "image" # Default to image if extension unknown/missing
+         return _media_type_for_suffix(os.path.splitext(path_str)[1].lower())
 
-    def _extract_media_placeholders(self, text: str, base_dir: Path) -> List[MediaPlaceholder]:
+    def _scan_content(self, text: str, find_title: bool = False) -> Tuple[Optional[str], List[MediaPlaceholder], str]:
         """
-        Finds all media placeholders in the text, including custom `placeholder:` syntax
-        and standard Markdown image/video links pointing to relative paths.
+        Scans the Markdown content once for media placeholders and, if requested,
+        the first H1 header within TITLE_SEARCH_LIMIT characters (used as fallback title). In the same pass, standard
+        image links to local files are rewritten to the `placeholder:` form so the
+        publisher can swap in the uploaded URL like it does for custom placeholders.
 
         Args:
             text (str): The Markdown content string.
-            base_dir (Path): The directory containing the Markdown file, used for
-                             resolving relative paths.
+            find_title (bool): Also capture the first H1 header during the scan.
+
+        Returns:
+            Tuple[Optional[str], List[MediaPlaceholder], str]: The H1 title (None if not
+            requested or not found), the identified media placeholders, and the
+            rewritten Markdown content to convert to HTML.
+        """
+        if not find_title and '![' not in text:
+            return None, [], text  # No image syntax at all: skip the regex engine entirely
+
+        title: Optional[str] = None
+        placeholders: List[MediaPlaceholder] = []
+        found_ids_or_paths = set()
+        parts: List[str] = []
+        # Bind per-match callables once; the loop body runs for every media tag
+        add_placeholder = placeholders.append
+        add_part = parts.append
+        from_match = self._placeholder_from_match
+        to_markdown = self._placeholder_markdown
+        search = (TITLE_OR_MEDIA_RE if find_title else MEDIA_RE).search
+        looking_for_title = find_title
+        pos = 0
+        while True:
+            match = search(text, pos)
+            if not match:
+                break
+            add_part(text[pos:match.start()])
+            pos = match.end()
+            if looking_for_title and match.group('h1') is not None:
+                if match.start() < TITLE_SEARCH_LIMIT:
+                    title = match.group('h1')
+                    log.debug("Extracted H1 title: '%s'", title)
+                looking_for_title, search = False, MEDIA_RE.search  # Only the first H1 counts; drop the title branch
+                continue
+            placeholder = from_match(match, found_ids_or_paths)
+            if placeholder:
+                add_placeholder(placeholder)
+            add_part(to_markdown(match))
+            if looking_for_title and pos >= TITLE_SEARCH_LIMIT:
+                looking_for_title, search = False, MEDIA_RE.search  # Past the title window; stop probing lines for an H1
+        add_part(text[pos:])
+        return title, placeholders, "".join(parts)
+
+    @staticmethod
+    def _placeholder_markdown(match: re.Match) -> str:
+        """
+        Returns the Markdown to emit for a MEDIA_RE match: local standard image links
+        become ![alt](placeholder:<normalized path>), keeping any link title; custom
+        placeholders, empty paths and remote (scheme://, data:) links are kept as written.
+        """
+        path = match.group('path')
+        if path is None:
+            return match.group(0)
+        if not path or '://' in path or path.startswith('data:'):
+            return match.group(0)
+        title = match.group('title')
+        title_suffix = f" {title}" if title else ""
+        return f"![{match.group('alt')}](placeholder:{_placeholder_id_for_path(path)}{title_suffix})"
+
+    def _placeholder_from_match(self, match: re.Match, found_ids_or_paths: set) -> Optional[MediaPlaceholder]:
+        """
+        Builds a MediaPlaceholder from a MEDIA_RE match.
+
+        Args:
+            match (re.Match): A match with the 'alt', 'pid' and 'path' groups.
+            found_ids_or_paths (set): IDs/paths already seen; updated in place.
 
         Returns:
-            List[MediaPlaceholder]: A list of identified media placeholders.
+            Optional[MediaPlaceholder]: The placeholder, or None if the tag is empty or a duplicate.
         """
-        placeholders = []
-        found_ids_or_paths = set()  # Track both IDs and resolved paths to avoid duplicates
+        original_tag = match.group(0)
+        alt_text = match.group('alt')
 
-        # 1. Find custom ![alt](placeholder:id) tags
-        for match in CUSTOM_MEDIA_PLACEHOLDER_RE.finditer(text):
-            original_tag = match.group(0)
-            alt_text = match.group(1).strip()
-            placeholder_id = match.group(2).strip()
+        if match.group('pid') is not None:
+            # 1. Custom placeholder tag
+            placeholder_id = match.group('pid')
 
             if not placeholder_id:
                 log.warning(f"Found custom placeholder with empty ID: {original_tag}. Skipping.")
-                continue
+                return None
 
             if placeholder_id in found_ids_or_paths:
                 log.warning(f"Duplicate media placeholder ID found: '{placeholder_id}'. Skipping subsequent occurrences.")
-                continue
+                return None
 
             media_type = self._get_media_type_from_path(placeholder_id)  # Infer from ID extension
 
@@ -219,57 +356,41 @@ class MarkdownParser:
                 media_type=media_type,
                 file_path=None  # Path needs to be found by uploader based on ID
             )
-            placeholders.append(placeholder)
             found_ids_or_paths.add(placeholder_id)
-            log.debug(f"Found custom media placeholder: ID='{placeholder_id}', Type='{media_type}', Alt='{alt_text}'")
+            log.debug("Found custom media placeholder: ID='%s', Type='%s', Alt='%s'", placeholder_id, media_type, alt_text)
+            return placeholder
 
-        # 2. Find standard ![alt](path/to/media.ext) tags
-        for match in STANDARD_IMAGE_RE.finditer(text):
-            original_tag = match.group(0)
-            alt_text = match.group('alt').strip()
-            relative_path_str = match.group('path').strip()
+        # 2. Standard image tag
+        relative_path_str = match.group('path')
 
-            if not relative_path_str:
-                log.warning(f"Found standard image tag with empty path: {original_tag}. Skipping.")
-                continue
+        if not relative_path_str:
+            log.warning(f"Found standard image tag with empty path: {original_tag}. Skipping.")
+            return None
 
-            # Resolve the relative path based on the Markdown file's location
-            # Note: This assumes the path is relative to the MD file itself.
-            # If paths are relative to INPUT_DIR, adjust base_dir accordingly.
-            try:
-                # Security: Prevent path traversal beyond input dir? Maybe not needed if trusted source.
-                absolute_path = (base_dir / relative_path_str).resolve()
-                # For consistency, store the *original* relative path found in the MD
-                stored_path_str = relative_path_str
-            except Exception as e:
-                log.warning(f"Could not resolve path '{relative_path_str}' from tag {original_tag}: {e}. Skipping.")
-                continue
+        # Store the *original* relative path found in the MD (relative to the MD file itself).
+        # It is not resolved here; the uploader resolves it and checks the file exists.
+        stored_path_str = relative_path_str
 
-            if stored_path_str in found_ids_or_paths:
-                 log.warning(f"Duplicate media path found: '{stored_path_str}'. Skipping subsequent occurrences.")
-                 continue
+        # Use the normalized relative path as the placeholder ID for standard links: the same
+        # ID _placeholder_markdown writes into the rewritten src, and unique per file
+        placeholder_id = _placeholder_id_for_path(stored_path_str)
 
-            # Use filename as the placeholder ID for standard links
-            placeholder_id = Path(stored_path_str).name
-            media_type = self._get_media_type_from_path(stored_path_str)
+        if placeholder_id in found_ids_or_paths:
+             log.warning(f"Duplicate media path found: '{stored_path_str}'. Skipping subsequent occurrences.")
+             return None
 
-            # Optional: Check if the resolved path actually exists here?
-            # if not absolute_path.is_file():
-            #     log.warning(f"Standard media file reference points to non-existent file: '{absolute_path}' from tag {original_tag}. Still creating placeholder.")
-            # We'll let the uploader handle the actual file existence check.
+        media_type = self._get_media_type_from_path(stored_path_str)
 
-            placeholder = MediaPlaceholder(
-                original_tag=original_tag,
-                placeholder_id=placeholder_id,  # Use filename as ID
-                alt_text=alt_text,
-                media_type=media_type,
-                file_path=stored_path_str  # Store the ORIGINAL relative path string
-            )
-            placeholders.append(placeholder)
-            found_ids_or_paths.add(stored_path_str)
-            log.debug(f"Found standard media reference: Path='{stored_path_str}', ID='{placeholder_id}', Type='{media_type}', Alt='{alt_text}'")
-
-        return placeholders
+        placeholder = MediaPlaceholder(
+            original_tag=original_tag,
+            placeholder_id=placeholder_id,  # Use normalized relative path as ID
+            alt_text=alt_text,
+            media_type=media_type,
+            file_path=stored_path_str  # Store the ORIGINAL relative path string
+        )
+        found_ids_or_paths.add(placeholder_id)
+        log.debug("Found standard media reference: Path='%s', ID='%s', Type='%s', Alt='%s'", stored_path_str, placeholder_id, media_type, alt_text)
+        return placeholder
 
 
 # Example Usage (demonstration - assuming settings.py exists)
@@ -9,8 +9,14 @@ information provided by the refined Article model (frontmatter metadata,
 explicit file paths from standard Markdown links).
 
 Dependencies:
+- hashlib (standard Python library)
+- logging (standard Python library)
+- os (standard Python library)
+- threading (standard Python library)
 - typing (standard Python library)
 - pathlib (standard Python library)
+- concurrent.futures (standard Python library)
+- src.api.base_client (HTTP_POOL_MAXSIZE)
 - src.api.wechat.client.WeChatClient
 - src.core.article_model.Article
 - src.core.settings
@@ -26,14 +32,26 @@ Expected Output:
 - Returns True if cover upload succeeds, False otherwise (content media failures only logged).
 """
 
-from typing import Dict, Optional, Tuple
+import hashlib
+import logging
+import os
+import threading
+from typing import Any, Dict, List, Optional, Tuple, Union
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
+from src.api.base_client import HTTP_POOL_MAXSIZE
 from src.api.wechat.client import WeChatClient
 from src.core.article_model import Article, MediaPlaceholder
 from src.core import settings
 from src.utils.logger import log
 
+# Media files are hashed for de-duplication in chunks of this size, never read whole
+HASH_CHUNK_SIZE = 1024 * 1024
+
+# Content media links with these prefixes point at the web; they are not uploaded
+REMOTE_MEDIA_PREFIXES = ('http://', 'https://')
+
 class WeChatMediaUploader:
     """Handles uploading media associated with an Article to WeChat."""
 
@@ -45,8 +63,43 @@ class WeChatMediaUploader:
             client (WeChatClient): An authenticated WeChat API client instance.
         """
         self.client = client
+        # Content uploads are network-bound; more workers than pooled connections would just queue
+        self.upload_concurrency = min(settings.WECHAT_UPLOAD_CONCURRENCY, HTTP_POOL_MAXSIZE)
+        # Upload results keyed by (size, content digest, media type): identical files are uploaded once
+        self._upload_cache: Dict[Tuple[int, bytes, str], Dict[str, Any]] = {}
+        # Path -> (mtime_ns, size, digest), so unchanged files are not re-read and re-hashed
+        self._digest_cache: Dict[str, Tuple[int, int, bytes]] = {}
+        # One lock per cache key, so concurrent uploads of identical content wait for the first
+        self._key_locks: Dict[Tuple[int, bytes, str], threading.Lock] = {}
+        self._key_locks_guard = threading.Lock()
+        # Per-run filesystem lookups: path -> is_file() result, directory -> first file in it
+        self._stat_cache: Dict[str, bool] = {}
+        self._first_file_cache: Dict[Path, Optional[Path]] = {}
+        self.refresh_paths()
         log.info("WeChatMediaUploader initialized.")
 
+    def clear_cache(self) -> None:
+        """
+        Forgets all cached upload results, file digests and filesystem lookups, e.g. after
+        media was deleted on the WeChat side and must be uploaded again.
+        """
+        with self._key_locks_guard:
+            self._upload_cache.clear()
+            self._key_locks.clear()
+        self._digest_cache.clear()
+        self._stat_cache.clear()
+        self._first_file_cache.clear()
+        log.info("WeChatMediaUploader caches cleared.")
+
+    def refresh_paths(self) -> None:
+        """
+        Binds the media directories from settings to the instance, so lookups avoid
+        repeated settings attribute chains. Runs on init and at the start of every upload run.
+        """
+        self._input_dir: Path = settings.INPUT_DIR
+        self._cover_dir: Path = settings.INPUT_COVER_IMAGE_DIR
+        self._content_dir: Path = settings.INPUT_CONTENT_IMAGE_DIR
+
     def upload_article_media(self, article: Article) -> bool:
         """
         Uploads the cover image and all content media referenced in the article.
@@ -60,8 +113,13 @@ class WeChatMediaUploader:
                   Failures in content media uploads are logged but do not cause a False return.
         """
         log.info(f"Starting media upload process for article: '{article.title}'")
+        # Forget earlier lookups so files added or removed between articles are seen
+        self._stat_cache.clear()
+        self._first_file_cache.clear()
+        self.refresh_paths()
         upload_success_count = 0
         upload_failure_count = 0
+        skipped_remote_count = 0
 
         # --- 1. Handle Cover Image Upload ---
         cover_success = self._upload_cover_image(article)
@@ -76,50 +134,185 @@ class WeChatMediaUploader:
         if not article.media_placeholders:
             log.info("No content media references found in the article.")
         else:
-            for placeholder in article.media_placeholders:
-                if placeholder.uploaded_media_id:
-                    log.debug(f"Skipping already uploaded media: {placeholder.placeholder_id}")
-                    upload_success_count +=1
-                    continue
-
-                # Determine the absolute path of the media file
-                media_file_path = self._find_media_file(placeholder, is_cover=False, article_base_dir=settings.INPUT_DIR) # Assume article path relative to INPUT_DIR
-
-                if not media_file_path:
-                    log.warning(f"Could not find file for content media placeholder ID='{placeholder.placeholder_id}', Path='{placeholder.file_path}'. Skipping upload.")
-                    upload_failure_count += 1
-                    continue # Skip this file
-
-                # Perform the upload (Content images/videos are usually permanent)
-                media_type = placeholder.media_type # 'image', 'video', etc. (set by parser)
-                log.info(f"Uploading content media ({media_type}) from: {media_file_path}")
-                upload_result = self.client.upload_media(
-                    file_path=str(media_file_path),
-                    media_type=media_type,
-                    is_permanent=True # Content media should typically be permanent
-                )
-
-                if upload_result and 'media_id' in upload_result:
-                    placeholder.uploaded_media_id = upload_result['media_id']
-                    placeholder.uploaded_url = upload_result.get('url') # URL is important!
-                    log.info(f"Content media '{placeholder.placeholder_id}' uploaded. Media ID: {placeholder.uploaded_media_id}, URL: {placeholder.uploaded_url}")
-                    upload_success_count += 1
-                else:
-                    log.error(f"Failed to upload content media: {media_file_path} (Placeholder ID: {placeholder.placeholder_id})")
-                    upload_failure_count += 1
-                    # Continue trying other media
+            pending_placeholders = self._pending_placeholders(article)
+            # Already uploaded media counts as done; remote (web URL) media is left as is
+            already_uploaded_count = sum(1 for placeholder in article.media_placeholders if placeholder.uploaded_media_id)
+            upload_success_count += already_uploaded_count
+            skipped_remote_count = len(article.media_placeholders) - already_uploaded_count - len(pending_placeholders)
+
+            resolved_uploads = self._resolve_all(pending_placeholders)
+            # Placeholders that still need uploading but whose file could not be found
+            upload_failure_count += len(pending_placeholders) - len(resolved_uploads)
+
+            uploaded_count = self._pool_upload(resolved_uploads)
+            upload_success_count += uploaded_count
+            upload_failure_count += len(resolved_uploads) - uploaded_count # Failures don't stop the other uploads
 
         # --- 3. Log Summary ---
         total_media = 1 + len(article.media_placeholders) # Cover + Content
-        log.info(f"Media upload process finished for article: '{article.title}'.")
-        log.info(f"Upload Summary: {upload_success_count} succeeded, {upload_failure_count} failed (out of {total_media} total media items).")
-        if upload_failure_count > 0:
-            log.warning("There were failures uploading some content media items. Check logs above.")
+        log.info("Media upload finished for '%s': %d/%d ok, %d failed, %d remote skipped.",
+                 article.title, upload_success_count, total_media, upload_failure_count, skipped_remote_count)
+        if upload_failure_count:
+            log.warning("%d content media item(s) failed to upload. Check logs above.", upload_failure_count)
 
         # Return True because cover succeeded (content failures don't block)
         return True
 
 
+    def _pending_placeholders(self, article: Article) -> List[MediaPlaceholder]:
+        """
+        Returns the content placeholders that still need uploading: local media without a media_id.
+        Skipped placeholders are logged in a separate pass, only when DEBUG logging is enabled.
+        """
+        pending_placeholders = [
+            placeholder for placeholder in article.media_placeholders
+            if not placeholder.uploaded_media_id
+            and not (placeholder.file_path and placeholder.file_path.startswith(REMOTE_MEDIA_PREFIXES))
+        ]
+        if len(pending_placeholders) < len(article.media_placeholders) and log.isEnabledFor(logging.DEBUG):
+            for placeholder in article.media_placeholders:
+                if placeholder.uploaded_media_id:
+                    log.debug("Skipping already uploaded media: %s", placeholder.placeholder_id)
+                elif placeholder.file_path and placeholder.file_path.startswith(REMOTE_MEDIA_PREFIXES):
+                    log.debug("Skipping remote media, left as linked: %s", placeholder.file_path)
+        return pending_placeholders
+
+    def _resolve_all(self, placeholders: List[MediaPlaceholder]) -> List[Tuple[MediaPlaceholder, Path]]:
+        """
+        Finds the files of the given content placeholders.
+        Lookups go through the per-run stat cache; each missing file is logged once here.
+
+        Args:
+            placeholders (List[MediaPlaceholder]): Placeholders to upload (see _pending_placeholders).
+
+        Returns:
+            List[Tuple[MediaPlaceholder, Path]]: (placeholder, resolved path) pairs, in article order.
+        """
+        resolved_uploads = []
+        for placeholder in placeholders:
+            # Determine the absolute path of the media file
+            media_file_path = self._find_media_file(placeholder, is_cover=False, article_base_dir=self._input_dir) # Assume article path relative to INPUT_DIR
+            if not media_file_path:
+                log.warning(f"Could not find file for content media placeholder ID='{placeholder.placeholder_id}', Path='{placeholder.file_path}'. Skipping upload.")
+                continue
+            resolved_uploads.append((placeholder, media_file_path))
+        return resolved_uploads
+
+    def _pool_upload(self, resolved_uploads: List[Tuple[MediaPlaceholder, Path]]) -> int:
+        """
+        Uploads resolved content media concurrently, bounded by self.upload_concurrency.
+
+        Args:
+            resolved_uploads (List[Tuple[MediaPlaceholder, Path]]): Output of _resolve_all.
+
+        Returns:
+            int: The number of successful uploads.
+        """
+        if not resolved_uploads:
+            return 0
+        uploaded_count = 0
+        workers = min(self.upload_concurrency, len(resolved_uploads))
+        # Each future owns one placeholder, so results are written back without locking
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            future_to_placeholder = {
+                executor.submit(self._upload_one, placeholder, path): placeholder for placeholder, path in resolved_uploads
+            }
+            for future in as_completed(future_to_placeholder):
+                try:
+                    if future.result():
+                        uploaded_count += 1
+                except Exception as e:
+                    # One failing file (e.g. a network error during token refresh) must not stop
+                    # the results of the others from being collected; it counts as a failure.
+                    log.exception("Unexpected error uploading content media '%s': %s",
+                                  future_to_placeholder[future].placeholder_id, e)
+        return uploaded_count
+
+    def _upload_one(self, placeholder: MediaPlaceholder, media_file_path: Path) -> bool:
+        """
+        Uploads one content media file and stores the result on its placeholder.
+        Runs on a worker thread; each call only touches its own placeholder.
+
+        Args:
+            placeholder (MediaPlaceholder): The content placeholder to upload for.
+            media_file_path (Path): The resolved path of the media file.
+
+        Returns:
+            bool: True if the upload succeeded, False otherwise.
+        """
+        # Perform the upload (Content images/videos are usually permanent)
+        media_type = placeholder.media_type # 'image', 'video', etc. (set by parser)
+        log.info(f"Uploading content media ({media_type}) from: {media_file_path}")
+        upload_result = self._upload_file(media_file_path, media_type) # Content media should typically be permanent
+
+        if upload_result and 'media_id' in upload_result:
+            placeholder.uploaded_media_id = upload_result['media_id']
+            placeholder.uploaded_url = upload_result.get('url') # URL is important!
+            log.info(f"Content media '{placeholder.placeholder_id}' uploaded. Media ID: {placeholder.uploaded_media_id}, URL: {placeholder.uploaded_url}")
+            return True
+        log.error(f"Failed to upload content media: {media_file_path} (Placeholder ID: {placeholder.placeholder_id})")
+        return False
+
+    def _upload_file(self, file_path: Path, media_type: str) -> Optional[Dict[str, Any]]:
+        """
+        Uploads a file as permanent media, reusing an earlier result for identical content.
+
+        Args:
+            file_path (Path): The resolved path of the media file.
+            media_type (str): The WeChat media type ('image', 'video', 'thumb', ...).
+
+        Returns:
+            Optional[Dict[str, Any]]: The upload result (with 'media_id'), or None on failure.
+        """
+        size_and_digest = self._file_digest(file_path)
+        if size_and_digest is None:
+            # Cannot de-duplicate; let the client report any read error
+            return self.client.upload_media(file_path=str(file_path), media_type=media_type, is_permanent=True)
+
+        cache_key = (*size_and_digest, media_type)
+        with self._key_locks_guard:
+            key_lock = self._key_locks.setdefault(cache_key, threading.Lock())
+        with key_lock:
+            if cache_key in self._upload_cache:
+                log.info(f"Reusing earlier upload of identical {media_type} content for: {file_path}")
+                return self._upload_cache[cache_key]
+
+            upload_result = self.client.upload_media(
+                file_path=str(file_path),
+                media_type=media_type,
+                is_permanent=True
+            )
+            if upload_result and 'media_id' in upload_result:
+                self._upload_cache[cache_key] = upload_result
+            return upload_result
+
+    def _file_digest(self, file_path: Path) -> Optional[Tuple[int, bytes]]:
+        """
+        Returns (size, BLAKE2b-128 digest) of a file's content, or None if it cannot be read.
+        The file is hashed in fixed-size chunks, and only again when its mtime or size has changed.
+        """
+        path_key = str(file_path)
+        try:
+            stat_result = file_path.stat()
+            cached = self._digest_cache.get(path_key)
+            if cached and cached[0] == stat_result.st_mtime_ns and cached[1] == stat_result.st_size:
+                return stat_result.st_size, cached[2]
+            hasher = hashlib.blake2b(digest_size=16)
+            buffer = bytearray(HASH_CHUNK_SIZE)
+            view = memoryview(buffer)
+            with open(file_path, 'rb', buffering=0) as f:
+                while True:
+                    read_size = f.readinto(buffer)
+                    if not read_size:
+                        break
+                    hasher.update(view[:read_size])
+            digest = hasher.digest()
+        except OSError as e:
+            log.warning(f"Could not hash media file {file_path} for upload de-duplication: {e}")
+            return None
+        self._digest_cache[path_key] = (stat_result.st_mtime_ns, stat_result.st_size, digest)
+        return stat_result.st_size, digest
+
     def _upload_cover_image(self, article: Article) -> bool:
         """
         Finds and uploads the cover image specified for the article.
@@ -138,33 +331,29 @@ class WeChatMediaUploader:
         if not cover_placeholder and not article.cover_image_file_path:
              log.error("No cover image reference found in article frontmatter ('cover_image' or 'cover_image_path'). Cannot determine cover image.")
              # Add fallback logic here if desired (e.g., check settings.INPUT_COVER_IMAGE_DIR)
-             log.warning(f"Attempting fallback: Searching for cover image in {settings.INPUT_COVER_IMAGE_DIR}")
-             try:
-                # Example fallback: look for file matching article title or first image
-                 potential_path = settings.INPUT_COVER_IMAGE_DIR / f"{article.title}.jpg"
-                 if potential_path.is_file():
+             log.warning(f"Attempting fallback: Searching for cover image in {self._cover_dir}")
+             # Example fallback: look for file matching article title or first image
+             for extension in ('.jpg', '.png'):
+                 potential_path = self._cover_dir / f"{article.title}{extension}"
+                 if self._is_file(potential_path):
                      cover_file_path = potential_path
-                 else:
-                     potential_path = settings.INPUT_COVER_IMAGE_DIR / f"{article.title}.png"
-                     if potential_path.is_file():
-                         cover_file_path = potential_path
-                     else: # Last resort: first file
-                        first_img = next(settings.INPUT_COVER_IMAGE_DIR.glob('*.*'))
-                        cover_file_path = first_img
-                 log.info(f"Using fallback cover image: {cover_file_path}")
-                 # Create a placeholder object for the fallback if needed for consistency
-                 if not cover_placeholder:
-                      cover_placeholder = MediaPlaceholder(placeholder_id=cover_file_path.name, media_type="thumb")
-                      article.cover_image_placeholder = cover_placeholder # Add to article
-             except StopIteration:
-                 log.error(f"Fallback failed: No cover image found in {settings.INPUT_COVER_IMAGE_DIR}.")
+                     break
+             else: # Last resort: first file
+                 cover_file_path = self._first_file_in(self._cover_dir)
+             if not cover_file_path:
+                 log.error(f"Fallback failed: No cover image found in {self._cover_dir}.")
                  return False # Cannot proceed without cover
+             log.info(f"Using fallback cover image: {cover_file_path}")
+             # Create a placeholder object for the fallback if needed for consistency
+             if not cover_placeholder:
+                  cover_placeholder = MediaPlaceholder(original_tag="", placeholder_id=cover_file_path.name, media_type="thumb")
+                  article.cover_image_placeholder = cover_placeholder # Add to article
 
 
         # If we don't have an absolute path yet, find it using the placeholder/path info
         if not cover_file_path:
             # Base directory for resolving cover paths could be INPUT_DIR or specific cover dir
-            cover_base_dir = settings.INPUT_COVER_IMAGE_DIR # Usually covers are here
+            cover_base_dir = self._cover_dir # Usually covers are here
             cover_file_path = self._find_media_file(
                 placeholder=cover_placeholder,
                 explicit_relative_path=article.cover_image_file_path,
@@ -178,15 +367,11 @@ class WeChatMediaUploader:
 
         # Ensure the placeholder exists in the article for storing results
         if not article.cover_image_placeholder:
-             article.cover_image_placeholder = MediaPlaceholder(placeholder_id=cover_file_path.name, media_type="thumb")
+             article.cover_image_placeholder = MediaPlaceholder(original_tag="", placeholder_id=cover_file_path.name, media_type="thumb")
 
         # Perform the upload (Covers *must* be 'thumb' type for WeChat drafts)
         log.info(f"Uploading cover image ('thumb') from: {cover_file_path}")
-        upload_result = self.client.upload_media(
-            file_path=str(cover_file_path),
-            media_type='thumb', # Hardcoded to thumb for cover
-            is_permanent=True # Often required for `thumb_media_id` in drafts
-        )
+        upload_result = self._upload_file(cover_file_path, 'thumb') # Hardcoded to thumb for cover; permanent is often required for `thumb_media_id` in drafts
 
         if upload_result and 'media_id' in upload_result:
             # Store results back into the placeholder object within the article
@@ -204,7 +389,7 @@ class WeChatMediaUploader:
                          placeholder: Optional[MediaPlaceholder],
                          explicit_relative_path: Optional[str] = None,
                          is_cover: bool = False,
-                         article_base_dir: Path = settings.INPUT_DIR) -> Optional[Path]:
+                         article_base_dir: Optional[Path] = None) -> Optional[Path]:
         """
         Finds the absolute path for a media item based on placeholder info or explicit path.
 
@@ -212,22 +397,26 @@ class WeChatMediaUploader:
             placeholder (Optional[MediaPlaceholder]): The placeholder object from the article.
             explicit_relative_path (Optional[str]): An explicit relative path (e.g., from cover_image_path).
             is_cover (bool): Flag indicating if this is the cover image.
-            article_base_dir (Path): The base directory to resolve relative paths against.
-                                     (e.g., settings.INPUT_DIR or settings.INPUT_COVER_IMAGE_DIR)
+            article_base_dir (Optional[Path]): The base directory to resolve relative paths against
+                                     (e.g., settings.INPUT_COVER_IMAGE_DIR). Defaults to settings.INPUT_DIR.
 
         Returns:
             Optional[Path]: The resolved absolute path to the media file, or None if not found.
         """
+        if article_base_dir is None:
+            article_base_dir = self._input_dir
+
         # Priority 1: Use explicit relative path if provided (e.g., standard MD link or cover_image_path)
         target_path_str = explicit_relative_path or (placeholder.file_path if placeholder else None)
         if target_path_str:
             try:
-                # Resolve relative path based on the article's input directory
+                # Resolve relative path based on the article's input directory. A lexical
+                # normpath is enough here (no realpath lstat walk); symlinks are followed by the stat.
                 # Security note: Ensure article_base_dir is trusted / within project
-                resolved_path = (article_base_dir / target_path_str).resolve()
-                if resolved_path.is_file():
-                    log.debug(f"Found media file via relative path '{target_path_str}': {resolved_path}")
-                    return resolved_path
+                resolved_path = os.path.normpath(os.path.join(os.fspath(article_base_dir), target_path_str))
+                if self._is_file(resolved_path):
+                    log.debug("Found media file via relative path '%s': %s", target_path_str, resolved_path)
+                    return Path(resolved_path)
                 else:
                     log.warning(f"Media file specified by path '{target_path_str}' not found at resolved location: {resolved_path}")
                     # Fall through to try finding by ID if path fails
@@ -237,11 +426,14 @@ class WeChatMediaUploader:
 
         # Priority 2: Look for file by placeholder ID in the designated directory
         if placeholder and placeholder.placeholder_id:
-            media_dir = settings.INPUT_COVER_IMAGE_DIR if is_cover else settings.INPUT_CONTENT_IMAGE_DIR
-            potential_path = media_dir / placeholder.placeholder_id
-            if potential_path.is_file():
-                log.debug(f"Found media file via placeholder ID '{placeholder.placeholder_id}' in {media_dir}: {potential_path}")
-                return potential_path
+            media_dir = self._cover_dir if is_cover else self._content_dir
+            # Standard links use their relative path as ID (e.g. 'img/x.png'); also try the bare filename
+            candidate_names = dict.fromkeys((placeholder.placeholder_id, os.path.basename(placeholder.placeholder_id)))
+            for candidate_name in candidate_names:
+                potential_path = media_dir / candidate_name
+                if self._is_file(potential_path):
+                    log.debug("Found media file via placeholder ID '%s' in %s: %s", placeholder.placeholder_id, media_dir, potential_path)
+                    return potential_path
             else:
                 # Try adding common extensions if ID has none? Could be risky.
                 log.warning(f"Media file not found by matching placeholder ID '{placeholder.placeholder_id}' in directory {media_dir}")
@@ -249,5 +441,36 @@ class WeChatMediaUploader:
         # Priority 3: (Optional / Fallback for cover only in _upload_cover_image)
         # Could add more fallbacks here if needed
 
-        log.debug(f"Could not find file for placeholder: {placeholder}, explicit path: {explicit_relative_path}")
-        return None
\ No newline at end of file
+        log.debug("Could not find file for placeholder: %s, explicit path: %s", placeholder, explicit_relative_path)
+        return None
+
+    def _is_file(self, path: Union[str, Path]) -> bool:
+        """Returns whether path is a regular file, stat-ing each path at most once per upload run."""
+        path_key = os.fspath(path)
+        is_file = self._stat_cache.get(path_key)
+        if is_file is None:
+            is_file = self._stat_cache[path_key] = os.path.isfile(path_key)
+        return is_file
+
+    def _first_file_in(self, directory: Path) -> Optional[Path]:
+        """
+        Returns the regular file (name with an extension) that sorts first by name in a
+        directory, or None. Picking by name keeps the choice independent of the filesystem's
+        listing order; it is one pass with no list built. The result is remembered for the
+        rest of the upload run.
+        """
+        if directory in self._first_file_cache:
+            return self._first_file_cache[directory]
+        first_entry: Optional[os.DirEntry] = None
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if (not entry.name.startswith('.') and '.' in entry.name
+                            and (first_entry is None or entry.name < first_entry.name)
+                            and entry.is_file(follow_symlinks=False)):
+                        first_entry = entry
+        except OSError as e:
+            log.warning(f"Could not list media directory {directory}: {e}")
+        first_file = Path(first_entry.path) if first_entry is not None else None
+        self._first_file_cache[directory] = first_file
+        return first_file
@@ -12,6 +12,8 @@ WeChat Official Account platform.
 Dependencies:
 - typing (standard Python library)
 - re (standard Python library)
+- logging, threading, time (standard Python library)
+- concurrent.futures (standard Python library)
 - src.api.wechat.client.WeChatClient
 - src.api.deepseek.deepseek_api.DeepSeekClient
 - src.core.article_model.Article
@@ -29,7 +31,11 @@ Expected Output:
 
 import re
 import json
-from typing import Optional, Dict, Any
+import logging
+import threading
+import time
+from typing import Optional, Dict, Any, List
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 from src.api.wechat.client import WeChatClient
 from src.api.deepseek.deepseek_api import DeepSeekClient
@@ -62,13 +68,63 @@ HTML_WRAPPER_TEMPLATE = """
 </html>
 """
 
+# The wrapper split once around its two fields, so assembly is a single join
+# (no format-spec parsing, no copy of the large content through format's buffer)
+_WRAPPER_PREFIX, _wrapper_rest = HTML_WRAPPER_TEMPLATE.replace('{{', '{').replace('}}', '}').split('{title}', 1)
+_WRAPPER_MIDDLE, _WRAPPER_SUFFIX = _wrapper_rest.split('{content}', 1)
+del _wrapper_rest
+
 # Corrected Regex (same as before, group count analysis was the issue)
-# Group 1: (<img.*?src=)
+# Group 1: (<img[^>]*?src=)
 # Group 2: (["\'])
-# Group 3: placeholder:(.*?)
+# Group 3: placeholder:([^"\']*)
 # \2: Matches closing quote (not a group)
-# Group 4: (.*?>) - Rest of tag
-HTML_PLACEHOLDER_SRC_RE = re.compile(r'(<img.*?src=)(["\'])placeholder:(.*?)\2(.*?>)', re.IGNORECASE)
+# Group 4: ([^>]*>) - Rest of tag
+# Substring every placeholder src contains (as written by the parser); cheap pre-check before the regex
+PLACEHOLDER_SRC_MARKER = 'placeholder:'
+# Tag syntax is ASCII, and bounded [^>] classes keep a match inside a single <img> tag.
+HTML_PLACEHOLDER_SRC_RE = re.compile(
+    r'(<img[^>]*?src=)(["\'])placeholder:([^"\']*)\2([^>]*>)', re.IGNORECASE | re.ASCII
+)
+
+# Characters that must be escaped when inserting plain text into HTML, mapped to the
+# same entities html.escape(quote=True) produces, so one str.translate pass does the job
+_HTML_ESCAPE_TABLE = str.maketrans({'&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;', "'": '&#x27;'})
+_HTML_UNSAFE_CHARS = frozenset('&<>"\'')
+
+
+def _escape_html(text: str) -> str:
+    """HTML-escapes text; returns it unchanged (no new string) when nothing needs escaping."""
+    if _HTML_UNSAFE_CHARS.isdisjoint(text):
+        return text
+    return text.translate(_HTML_ESCAPE_TABLE)
+
+
+# WeChat draft digest (abstract) limit, in characters
+MAX_SUMMARY_LENGTH = 120
+
+# Multi-article publishing: draft API calls in flight at once, and the overall call rate
+MAX_CONCURRENT_DRAFTS = 4
+DRAFT_REQUESTS_PER_SECOND = 5.0
+
+
+class _RateLimiter:
+    """Spaces calls at least 1/rate seconds apart across threads (the first call never waits)."""
+
+    def __init__(self, rate_per_second: float):
+        self._interval = 1.0 / rate_per_second
+        self._next_slot = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self) -> None:
+        """Blocks until this caller's slot; slots are handed out in call order."""
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self._interval
+        delay = slot - now
+        if delay > 0:
+            time.sleep(delay)
 
 
 class WeChatPublisher:
@@ -84,8 +140,84 @@ class WeChatPublisher:
         """
         self.wechat_client = wechat_client
         self.deepseek_client = deepseek_client
+        # Shared by all draft API calls of this publisher, including concurrent ones
+        self._rate_limiter = _RateLimiter(DRAFT_REQUESTS_PER_SECOND)
+        # Title -> draft media_id (None: no such draft) from earlier lookups and creations
+        self._title_to_media_id: Dict[str, Optional[str]] = {}
+        # Title -> lock serializing find-then-create for that title across publish_drafts workers
+        self._title_locks: Dict[str, threading.Lock] = {}
+        self._title_locks_guard = threading.Lock()
+        self.refresh()
         log.info("WeChatPublisher initialized.")
 
+    def refresh(self) -> None:
+        """Re-reads the publishing defaults from settings (call after settings are reloaded)."""
+        self._author = settings.ARTICLE_AUTHOR
+        self._need_open_comment = 1 if settings.ENABLE_COMMENTS else 0
+        self._is_original = 1 if settings.MARK_AS_ORIGINAL else 0
+
+    def generate_summaries(self, articles: List[Article]) -> None:
+        """
+        Fills in missing summaries for several articles with one batched DeepSeek request,
+        instead of one round-trip per article. Articles that still lack a summary afterwards
+        (e.g. empty text, or missing from the reply) are handled again by publish_draft.
+
+        Args:
+            articles (List[Article]): The articles to summarize; ones with a summary are skipped.
+        """
+        if not self.deepseek_client:
+            log.warning("DeepSeekClient not provided. Skipping summary generation.")
+            return
+        to_summarize = []
+        texts = []
+        for article in articles:
+            if article.summary:
+                continue
+            text = article.get_content_as_text()
+            if text:
+                to_summarize.append(article)
+                texts.append(text)
+        if not to_summarize:
+            return
+
+        log.info("Generating summaries for %d articles using DeepSeek...", len(to_summarize))
+        summaries = self.deepseek_client.generate_summaries_batch(texts)
+        for article, summary in zip(to_summarize, summaries):
+            if summary:
+                article.summary = summary
+
+    def publish_drafts(self, articles: List[Article], check_existing: bool = True) -> List[Optional[str]]:
+        """
+        Publishes several articles: summaries are generated in a single batch and payloads
+        are prepared in order, then the draft API calls run concurrently (bounded by
+        MAX_CONCURRENT_DRAFTS and rate-limited to DRAFT_REQUESTS_PER_SECOND).
+
+        Args:
+            articles (List[Article]): The processed article objects with uploaded media info.
+            check_existing (bool): Passed to publish_draft for each article.
+
+        Returns:
+            List[Optional[str]]: The draft media_id for each article (None on failure), in order.
+        """
+        self.generate_summaries(articles)
+        results: List[Optional[str]] = [None] * len(articles)
+        prepared = []
+        for index, article in enumerate(articles):
+            draft_payload = self._prepare_draft(article)
+            if draft_payload is not None:
+                prepared.append((index, article, draft_payload))
+        if not prepared:
+            return results
+
+        with ThreadPoolExecutor(max_workers=min(MAX_CONCURRENT_DRAFTS, len(prepared))) as executor:
+            futures = {
+                executor.submit(self._persist_draft, article, draft_payload, check_existing): index
+                for index, article, draft_payload in prepared
+            }
+            for future in as_completed(futures):
+                results[futures[future]] = future.result()
+        return results
+
     def publish_draft(self, article: Article, check_existing: bool = True) -> Optional[str]:
         """
         Assembles the article content, generates summary, and saves/updates a WeChat draft.
@@ -98,21 +230,48 @@ class WeChatPublisher:
         Returns:
             Optional[str]: The media_id of the draft, or None on failure.
         """
-        log.info(f"Starting publication process for article: '{article.title}'")
+        draft_payload = self._prepare_draft(article)
+        if draft_payload is None:
+            return None
+        return self._persist_draft(article, draft_payload, check_existing)
+
+    def _prepare_draft(self, article: Article) -> Optional[Dict[str, Any]]:
+        """
+        Local (CPU-bound) part of publishing: checks the cover, assembles the HTML,
+        ensures a summary and builds the WeChat draft payload.
+
+        Args:
+            article (Article): The processed article object with uploaded media info.
+
+        Returns:
+            Optional[Dict[str, Any]]: The draft payload, or None on failure.
+        """
+        log.info("Starting publication process for article: '%s'", article.title)
 
         # 1. Ensure Cover Image is Ready
         if not article.cover_image_placeholder or not article.cover_image_placeholder.uploaded_media_id:
-            log.error(f"Cannot publish draft: Cover image media ID is missing for article '{article.title}'.")
+            log.error("Cannot publish draft: Cover image media ID is missing for article '%s'.", article.title)
             return None
         cover_media_id = article.cover_image_placeholder.uploaded_media_id
-        log.info(f"Using cover image media ID: {cover_media_id}")
+        log.info("Using cover image media ID: %s", cover_media_id)
 
         # 2. Assemble Final HTML Content (Replace Placeholders)
-        final_html_content = self._assemble_html_content(article)
-        if not final_html_content:
-            log.error(f"Cannot publish draft: Failed to assemble final HTML content for '{article.title}'.")
-            return None
-        article.final_html_content = final_html_content # Store it back if needed
+        # Reuse HTML assembled by an earlier call (e.g. a retry after a failed API call)
+        if article.final_html_content:
+            log.info("Reusing previously assembled HTML content.")
+            final_html_content = article.final_html_content
+        else:
+            unresolved_ids: List[str] = []
+            final_html_content = self._assemble_html_content(article, unresolved_ids)
+            if not final_html_content:
+                log.error("Cannot publish draft: Failed to assemble final HTML content for '%s'.", article.title)
+                return None
+            if unresolved_ids:
+                # Images were dropped for media without an uploaded URL; assemble again next time
+                # so a retry after re-uploading picks them up instead of resending the gaps.
+                log.info("Not caching assembled HTML: %d media reference(s) unresolved.", len(unresolved_ids))
+            else:
+                article.final_html_content = final_html_content # Cache on the article for later calls
 
         # 3. Generate Article Summary (Abstract)
         if not article.summary: # Only generate if not already present
@@ -121,12 +280,12 @@ class WeChatPublisher:
                 content_for_summary = article.get_content_as_text()
                 if not content_for_summary:
                      log.warning("Content for summary generation is empty. Trying HTML content.")
-                     content_for_summary = article.final_html_content[:1000]
+                     content_for_summary = final_html_content[:1000]
 
                 if content_for_summary:
                     article.summary = self.deepseek_client.generate_summary(content_for_summary)
                     if article.summary:
-                        log.info(f"Generated summary: '{article.summary}'")
+                        log.info("Generated summary: '%s'", article.summary)
                     else:
                         log.warning("Failed to generate summary from DeepSeek. Proceeding without summary.")
                 else:
@@ -134,88 +293,129 @@ class WeChatPublisher:
             else:
                 log.warning("DeepSeekClient not provided. Skipping summary generation.")
         else:
-             log.info(f"Using existing summary for article: '{article.summary}'")
+             log.info("Using existing summary for article: '%s'", article.summary)
 
-        summary = article.summary or ""
-        MAX_SUMMARY_LENGTH = 120
-        if len(summary) > MAX_SUMMARY_LENGTH:
-             log.warning(f"Summary exceeds estimated length limit ({MAX_SUMMARY_LENGTH} chars), truncating.")
-             summary = summary[:MAX_SUMMARY_LENGTH]
+        summary = (article.summary or "")[:MAX_SUMMARY_LENGTH] # No copy when already short enough
+        if article.summary and len(article.summary) > MAX_SUMMARY_LENGTH:
+             log.warning("Summary exceeds estimated length limit (%d chars), truncating.", MAX_SUMMARY_LENGTH)
 
 
         # 4. Prepare WeChat Draft Payload
         draft_payload = {
             "title": article.title,
-            "author": settings.ARTICLE_AUTHOR,
+            "author": self._author,
             "digest": summary,
-            "content": article.final_html_content,
+            "content": final_html_content,
             "content_source_url": "",
             "thumb_media_id": cover_media_id,
-            "need_open_comment": 1 if settings.ENABLE_COMMENTS else 0,
+            "need_open_comment": self._need_open_comment,
             "only_fans_can_comment": 0,
-            "is_original": 1 if settings.MARK_AS_ORIGINAL else 0,
+            "is_original": self._is_original,
             "show_cover_pic": 1,
         }
-        log.debug(f"Prepared draft payload (excluding content): { {k:v for k,v in draft_payload.items() if k != 'content'} }")
+        if log.isEnabledFor(logging.DEBUG): # The dict copy itself is not free
+            log.debug("Prepared draft payload (excluding content): %s", {k: v for k, v in draft_payload.items() if k != 'content'})
+        return draft_payload
+
+    def _persist_draft(self, article: Article, draft_payload: Dict[str, Any], check_existing: bool) -> Optional[str]:
+        """
+        Network part of publishing: finds an existing draft (optionally) and updates it,
+        or creates a new one. Safe to run on worker threads, even for articles sharing a title.
 
-        # 5. Idempotency Check
-        existing_draft_media_id: Optional[str] = None
-        if check_existing:
+        Args:
+            article (Article): The article being published.
+            draft_payload (Dict[str, Any]): The payload built by _prepare_draft.
+            check_existing (bool): If True, update an existing draft with the same title.
+
+        Returns:
+            Optional[str]: The media_id of the draft, or None on failure.
+        """
+        with self._title_locks_guard:
+            title_lock = self._title_locks.setdefault(article.title, threading.Lock())
+        # Held through lookup and create/update: a second article with this title waits and then
+        # sees the draft the first one created, instead of adding a duplicate
+        with title_lock:
+            # 5. Idempotency Check
+            existing_draft_media_id: Optional[str] = None
+            if check_existing:
+                try:
+                    if article.title in self._title_to_media_id:
+                        # Drafts listed (or created) earlier by this publisher; skip the listing call
+                        existing_draft_media_id = self._title_to_media_id[article.title]
+                    else:
+                        log.info("Checking for existing draft with title: '%s'", article.title)
+                        self._rate_limiter.wait()
+                        existing_draft_media_id = self.wechat_client.find_draft_by_title(article.title)
+                        self._title_to_media_id[article.title] = existing_draft_media_id
+                    if existing_draft_media_id:
+                        log.info("Found existing draft with media_id: %s", existing_draft_media_id)
+                    else:
+                        log.info("No existing draft found with this title.")
+                except Exception as e:
+                    log.warning("Failed to check for existing draft due to error: %s. Will attempt to create a new draft.", e)
+
+            # 6. Save Draft to WeChat
+            draft_media_id: Optional[str] = None
             try:
-                log.info(f"Checking for existing draft with title: '{article.title}'")
-                existing_draft_media_id = self.wechat_client.find_draft_by_title(article.title)
                 if existing_draft_media_id:
-                    log.info(f"Found existing draft with media_id: {existing_draft_media_id}")
-                else:
-                    log.info("No existing draft found with this title.")
-            except Exception as e:
-                log.warning(f"Failed to check for existing draft due to error: {e}. Will attempt to create a new draft.")
-
-        # 6. Save Draft to WeChat
-        draft_media_id: Optional[str] = None
-        try:
-            if existing_draft_media_id:
-                log.info(f"Attempting to update existing draft {existing_draft_media_id}.")
-                success = self.wechat_client.update_draft(
-                    draft_media_id=existing_draft_media_id,
-                    article_index=0,
-                    article_data=draft_payload
-                )
-                if success:
-                    log.info(f"Successfully updated draft {existing_draft_media_id}.")
-                    draft_media_id = existing_draft_media_id
-                else:
-                    log.error(f"Failed to update existing draft {existing_draft_media_id}. Check WeChatClient logs for details.")
-                    return None
-            else:
-                log.info("Attempting to create new draft.")
-                draft_media_id = self.wechat_client.add_draft(draft_payload)
-                if draft_media_id:
-                     log.info(f"Successfully created new draft with media_id: {draft_media_id}")
+                    log.info("Attempting to update existing draft %s.", existing_draft_media_id)
+                    self._rate_limiter.wait()
+                    success = self.wechat_client.update_draft(
+                        draft_media_id=existing_draft_media_id,
+                        article_index=0,
+                        article_data=draft_payload
+                    )
+                    if success:
+                        log.info("Successfully updated draft %s.", existing_draft_media_id)
+                        draft_media_id = existing_draft_media_id
+                    else:
+                        log.error("Failed to update existing draft %s. Check WeChatClient logs for details.", existing_draft_media_id)
+                        # The draft may be gone on the server: forget it so the next publish re-lists or creates
+                        self._title_to_media_id.pop(article.title, None)
+                        return None
                 else:
-                     log.error(f"Failed to create new draft for '{article.title}'. Check WeChatClient logs for details.")
-                     return None
-
-        except Exception as e:
-            log.exception(f"An unexpected error occurred during draft creation/update for '{article.title}': {e}")
-            return None
+                    log.info("Attempting to create new draft.")
+                    self._rate_limiter.wait()
+                    draft_media_id = self.wechat_client.add_draft(draft_payload)
+                    if draft_media_id:
+                         log.info("Successfully created new draft with media_id: %s", draft_media_id)
+                         self._title_to_media_id[article.title] = draft_media_id # Later publishes update it
+                    else:
+                         log.error("Failed to create new draft for '%s'. Check WeChatClient logs for details.", article.title)
+                         return None
 
-        # 7. Logging Final Status
-        log.info(f"--- Draft Publication Summary for '{article.title}' ---")
-        log.info(f"  Operation Status: {'Updated' if existing_draft_media_id and draft_media_id else 'Created'}")
-        log.info(f"  Draft Media ID: {draft_media_id}")
-        log.info(f"  Title: {draft_payload['title']}")
-        log.info(f"  Author: {draft_payload['author']}")
-        log.info(f"  Cover Media ID: {draft_payload['thumb_media_id']}")
-        log.info(f"  Summary Provided: {'Yes' if draft_payload['digest'] else 'No'}")
-        log.info(f"  Originality Marked: {settings.MARK_AS_ORIGINAL}")
-        log.info(f"  Comments Enabled: {bool(draft_payload['need_open_comment'])}")
-        log.info("-----------------------------------------------------")
+            except Exception as e:
+                log.exception("An unexpected error occurred during draft creation/update for '%s': %s", article.title, e)
+                self._title_to_media_id.pop(article.title, None) # Don't trust a cached media_id after a failure
+                return None
+
+        # 7. Logging Final Status (one record, so handlers run once per publish)
+        log.info(
+            "--- Draft Publication Summary for '%s' ---\n"
+            "  Operation Status: %s\n"
+            "  Draft Media ID: %s\n"
+            "  Title: %s\n"
+            "  Author: %s\n"
+            "  Cover Media ID: %s\n"
+            "  Summary Provided: %s\n"
+            "  Originality Marked: %s\n"
+            "  Comments Enabled: %s\n"
+            "-----------------------------------------------------",
+            article.title,
+            'Updated' if existing_draft_media_id and draft_media_id else 'Created',
+            draft_media_id,
+            draft_payload['title'],
+            draft_payload['author'],
+            draft_payload['thumb_media_id'],
+            'Yes' if draft_payload['digest'] else 'No',
+            bool(draft_payload['is_original']),
+            bool(draft_payload['need_open_comment']),
+        )
 
         return draft_media_id
 
 
-    def _assemble_html_content(self, article: Article) -> Optional[str]:
+    def _assemble_html_content(self, article: Article, unresolved_ids: Optional[List[str]] = None) -> Optional[str]:
         """
         Takes the base HTML content from the first ContentElement and replaces
         media placeholders with actual WeChat image URLs. Wraps content in a
@@ -224,6 +424,8 @@ class WeChatPublisher:
         Args:
             article (Article): The article object containing ContentElements and
                                uploaded media details in placeholders.
+            unresolved_ids (Optional[List[str]]): If given, receives the IDs of placeholders
+                               whose img tags were removed for lack of an uploaded URL.
 
         Returns:
             Optional[str]: The final HTML string ready for WeChat, or None on error.
@@ -233,42 +435,64 @@ class WeChatPublisher:
             return None
         current_html = article.content_elements[0].content
 
-        log.debug("Starting HTML media placeholder replacement...")
-
-        # Use a function for the replacement logic in re.sub
-        def replace_placeholder(match):
-            # Group 1: <img...src=
-            img_tag_start_before_quote = match.group(1)
-            # Group 2: The quote character (" or ')
-            quote = match.group(2)
-            # Group 3: The placeholder ID
-            placeholder_id = match.group(3)
-            # *** CORRECTED SECTION ***
-            # Group 4: The rest of the tag (after the closing quote of src)
-            img_tag_end_after_quote = match.group(4)
-            # *** END CORRECTION ***
-
-            placeholder = article.get_placeholder_by_id(placeholder_id)
-            if placeholder and placeholder.uploaded_url:
-                log.debug(f"Replacing placeholder '{placeholder_id}' with URL: {placeholder.uploaded_url}")
-                # Reconstruct the tag correctly: G1 + G2 + url + G2 + G4
-                return f'{img_tag_start_before_quote}{quote}{placeholder.uploaded_url}{quote}{img_tag_end_after_quote}'
-            else:
-                log.warning(f"Could not find uploaded URL for placeholder ID '{placeholder_id}' referenced in HTML. Removing corresponding img tag.")
-                return "" # Return empty string to remove the tag
-
-        # Perform the replacement using the corrected regex and replacement function
-        final_content_html = HTML_PLACEHOLDER_SRC_RE.sub(replace_placeholder, current_html)
+        if PLACEHOLDER_SRC_MARKER in current_html:
+            final_content_html = self._replace_placeholders(article, current_html, unresolved_ids)
+        else:
+            # No media references (e.g. text-only posts): skip driving the regex over the whole HTML
+            log.debug("No media placeholders in HTML, skipping replacement.")
+            final_content_html = current_html
 
         # Wrap in full HTML structure
         try:
             # Optional: Load CSS styles here if needed
             pass
         except Exception as e:
-            log.warning(f"Could not load or embed CSS styles: {e}")
+            log.warning("Could not load or embed CSS styles: %s", e)
 
-        full_html = HTML_WRAPPER_TEMPLATE.format(title=article.title, content=final_content_html)
+        full_html = "".join((_WRAPPER_PREFIX, _escape_html(article.title), _WRAPPER_MIDDLE, final_content_html, _WRAPPER_SUFFIX))
 
         log.info("Successfully assembled final HTML content.")
-        log.debug(f"Final HTML (first 500 chars): {full_html[:500]}...")
-        return full_html
\ No newline at end of file
+        log.debug("Final HTML (first 500 chars): %.500s...", full_html) # Precision slices lazily
+        return full_html
+
+    def _replace_placeholders(self, article: Article, current_html: str, unresolved_ids: Optional[List[str]] = None) -> str:
+        """
+        Replaces the src of each <img src="placeholder:ID"> with the uploaded WeChat URL,
+        removing the tag when no URL is known for the ID.
+
+        Args:
+            article (Article): The article whose placeholders hold the upload results.
+            current_html (str): The HTML produced by the parser.
+            unresolved_ids (Optional[List[str]]): If given, receives the IDs whose tags were removed.
+
+        Returns:
+            str: The HTML with placeholders replaced.
+        """
+        log.debug("Starting HTML media placeholder replacement...")
+
+        # ID -> placeholder, built once so each match is a dict lookup instead of a list scan.
+        # Same precedence as Article.get_placeholder_by_id: first content placeholder, then the cover.
+        placeholder_map = {p.placeholder_id: p for p in reversed(article.media_placeholders)}
+        if article.cover_image_placeholder:
+            placeholder_map.setdefault(article.cover_image_placeholder.placeholder_id, article.cover_image_placeholder)
+
+        # Use a function for the replacement logic in re.sub; the lookup is bound as a default
+        # argument and the groups are unpacked in one call, since this runs once per image
+        def replace_placeholder(match, _get_placeholder=placeholder_map.get):
+            # Groups: <img...src= | quote (" or ') | placeholder ID | rest of the tag after the closing quote
+            img_tag_start_before_quote, quote, placeholder_id, img_tag_end_after_quote = match.groups()
+
+            placeholder = _get_placeholder(placeholder_id)
+            if placeholder and placeholder.uploaded_url:
+                log.debug("Replacing placeholder '%s' with URL: %s", placeholder_id, placeholder.uploaded_url)
+                # Reconstruct the tag correctly: G1 + G2 + url + G2 + G4
+                return f'{img_tag_start_before_quote}{quote}{placeholder.uploaded_url}{quote}{img_tag_end_after_quote}'
+            else:
+                log.warning("Could not find uploaded URL for placeholder ID '%s' referenced in HTML. Removing corresponding img tag.", placeholder_id)
+                if unresolved_ids is not None:
+                    unresolved_ids.append(placeholder_id)
+                return "" # Return empty string to remove the tag
+
+        # Perform the replacement using the compiled regex's bound sub and the replacement function
+        substitute_placeholders = HTML_PLACEHOLDER_SRC_RE.sub
+        return substitute_placeholders(replace_placeholder, current_html)
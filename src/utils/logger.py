@@ -11,7 +11,8 @@ Dependencies:
 - logging (standard Python library)
 
 Expected Input: None
-Expected Output: A configured logging.Logger instance.
+Expected Output: The application logger (`log`); handlers are attached by calling
+                 setup_logger() once at process start (see src/main.py).
 """
 
 import logging
@@ -19,8 +20,9 @@ import sys
 
 LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 LOG_LEVEL = logging.INFO  # Default level, can be configured externally if needed
+LOGGER_NAME = 'wechat_publisher'
 
-def setup_logger(name: str = 'wechat_publisher', level: int = LOG_LEVEL) -> logging.Logger:
+def setup_logger(name: str = LOGGER_NAME, level: int = LOG_LEVEL) -> logging.Logger:
     """
     Configures and returns a logger instance.
 
@@ -37,9 +39,8 @@ def setup_logger(name: str = 'wechat_publisher', level: int = LOG_LEVEL) -> logg
     if not logger.handlers:
         logger.setLevel(level)
 
-        # Console Handler
+        # Console Handler (no level of its own: the logger level is the single switch)
         console_handler = logging.StreamHandler(sys.stdout)
-        console_handler.setLevel(level)
 
         # Formatter
         formatter = logging.Formatter(LOG_FORMAT)
@@ -61,8 +62,10 @@ def setup_logger(name: str = 'wechat_publisher', level: int = LOG_LEVEL) -> logg
 
     return logger
 
-# Initialize a default logger instance for easy import
-log = setup_logger()
+# The application logger for easy import. Importing creates no handlers or formatters;
+# the entry point calls setup_logger() once. Until then records propagate to the root logger.
+log = logging.getLogger(LOGGER_NAME)
+log.setLevel(LOG_LEVEL)
 
 # Example Usage (in other modules):
 # from src.utils.logger import log
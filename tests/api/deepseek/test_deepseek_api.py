@@ -154,4 +154,26 @@ def test_generate_summary_custom_instruction(deepseek_client, mock_base_make_req
     headers = call_kwargs.get('headers')
     assert headers is not None
     assert 'Authorization' in headers
-    assert headers['Authorization'] == 'Bearer test-deepseek-key'
\ No newline at end of file
+    assert headers['Authorization'] == 'Bearer test-deepseek-key'
+
+def test_generate_summaries_batch_single_request(deepseek_client, mock_base_make_request):
+    """Test several texts are summarized with one request and the reply is split per item."""
+    reply = "### Item 1\nFirst summary.\n\n### Item 2\n\"Second summary.\""
+    mock_base_make_request.return_value = ({"choices": [{"message": {"content": reply}}]}, None)
+
+    summaries = deepseek_client.generate_summaries_batch(["First text.", "", "Second text."])
+
+    assert summaries == ["First summary.", None, "Second summary."]  # Empty input gets no summary
+    mock_base_make_request.assert_called_once()
+    payload = mock_base_make_request.call_args.kwargs['json_payload']
+    assert payload['messages'][1]['content'] == "### Item 1\nFirst text.\n\n### Item 2\nSecond text."
+    assert payload['max_tokens'] == 300
+
+def test_generate_summaries_batch_missing_item(deepseek_client, mock_base_make_request, caplog):
+    """Test an item missing from the batch reply is returned as None."""
+    mock_base_make_request.return_value = ({"choices": [{"message": {"content": "### Item 2\nOnly the second."}}]}, None)
+
+    summaries = deepseek_client.generate_summaries_batch(["First text.", "Second text."])
+
+    assert summaries == [None, "Only the second."]
+    assert "missing 1 of 2 summaries" in caplog.text
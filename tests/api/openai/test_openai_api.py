@@ -2,36 +2,59 @@
 
 import pytest
 import requests
-import openai # Import openai library itself for error types
-from unittest.mock import MagicMock, patch, PropertyMock
+import openai # Patched as openai.OpenAI, so referenced through the module
+from openai import RateLimitError
+from requests.exceptions import ConnectionError as RequestsConnectionError
+from unittest.mock import MagicMock, patch, PropertyMock, mock_open
 from pathlib import Path
 
 # Modules to test
 from src.api.openai.openai_api import OpenAIClient
 from src.core import settings
 
-# --- Fixtures ---
+# Downloaded image body, streamed in chunks like requests' iter_content
+_IMAGE_CHUNKS = (b'mock', b'image', b'data')
 
-@pytest.fixture
-def mock_settings_openai(mocker):
-    """Mocks settings used by OpenAIClient."""
-    mocker.patch('src.core.settings.OPENAI_API_KEY', 'test-openai-key')
-    mocker.patch('src.core.settings.OPENAI_IMAGE_MODEL', 'dall-e-test')
-    return settings
+def _stream_image_chunks(chunk_size=None):
+    """iter_content stand-in: a fresh iterator over the fixed chunks on every call."""
+    return iter(_IMAGE_CHUNKS)
 
-@pytest.fixture
-def mock_openai_client_instance(mocker):
-    """Mocks the openai.OpenAI() instance and its methods."""
-    mock_instance = MagicMock()
-    # Mock the images.generate structure
-    mock_instance.images = MagicMock()
-    mock_instance.images.generate = MagicMock()
-    mocker.patch('openai.OpenAI', return_value=mock_instance) # Patch the class constructor
-    return mock_instance
+# --- Fixtures ---
+
+@pytest.fixture(scope="module")
+def mock_settings_openai():
+    """Mocks settings used by OpenAIClient (constants, so set once for the module)."""
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(settings, 'OPENAI_API_KEY', 'test-openai-key', raising=False)
+        mp.setattr(settings, 'OPENAI_IMAGE_MODEL', 'dall-e-test', raising=False)
+        yield settings
+
+@pytest.fixture(scope="module")
+def mock_openai_client_instance():
+    """
+    Factory for the mocked openai.OpenAI() instance. The mock (with its images.generate
+    structure) is built and patched in once per module; each call resets it and returns it.
+    """
+    base_instance = MagicMock()
+    base_instance.images.generate = MagicMock()
+    with patch('openai.OpenAI', return_value=base_instance) as mock_openai_class: # Patch the class constructor
+        def make():
+            mock_openai_class.reset_mock()
+            base_instance.reset_mock(return_value=True, side_effect=True)
+            return base_instance
+        yield make
+
+@pytest.fixture(autouse=True)
+def mock_requests_get(monkeypatch):
+    """Swaps requests.get (used for image downloads) for a MagicMock handler in every test."""
+    handler = MagicMock()
+    monkeypatch.setattr(requests, 'get', handler)
+    return handler
 
 @pytest.fixture
 def openai_client_fixture(mock_settings_openai, mock_openai_client_instance):
     """Provides an OpenAIClient instance with mocked underlying client."""
+    mock_openai_client_instance() # Start each client from a freshly reset mock
     client = OpenAIClient()
     # The internal self.client is already the mocked instance
     return client
@@ -40,7 +63,9 @@ def openai_client_fixture(mock_settings_openai, mock_openai_client_instance):
 
 def test_openai_client_init_success(mock_settings_openai, mock_openai_client_instance):
     """Test successful initialization."""
+    mock_instance = mock_openai_client_instance()
     client = OpenAIClient()
+    assert client.client is mock_instance
     assert client.model == 'dall-e-test'
     # Check if OpenAI() constructor was called with the key
     openai.OpenAI.assert_called_once_with(api_key='test-openai-key')
@@ -51,31 +76,33 @@ def test_openai_client_init_missing_key(mocker):
     with pytest.raises(ValueError, match="OPENAI_API_KEY must be configured"):
         OpenAIClient()
 
-@patch('requests.get') # Patch requests.get globally for download test
-def test_generate_image_success(mock_requests_get, openai_client_fixture, mock_openai_client_instance, tmp_path, caplog):
-    """Test successful image generation, download, and saving."""
+def test_generate_image_success(mock_requests_get, openai_client_fixture, mock_openai_client_instance, tmp_path, caplog, mocker):
+    """Test successful image generation, download, and saving (writes go to a mocked file, not disk)."""
+    mock_openai = mock_openai_client_instance()
     # Configure mock OpenAI response
     mock_image_url = "https://mock.openai.com/image.png"
     mock_openai_response = MagicMock()
     mock_openai_response.data = [MagicMock(url=mock_image_url)]
-    mock_openai_client_instance.images.generate.return_value = mock_openai_response
+    mock_openai.images.generate.return_value = mock_openai_response
 
     # Configure mock download response
     mock_download_response = MagicMock()
     mock_download_response.raise_for_status.return_value = None
-    mock_download_response.iter_content.return_value = [b'mock', b'image', b'data']
+    mock_download_response.iter_content.side_effect = _stream_image_chunks
     mock_requests_get.return_value = mock_download_response
 
     prompt = "A test prompt"
     output_file = tmp_path / "generated_image.png"
+    mocked_open = mocker.patch('builtins.open', mock_open())
 
     result_path = openai_client_fixture.generate_image(prompt, output_file)
 
     assert result_path == output_file
-    assert output_file.exists()
-    assert output_file.read_bytes() == b'mockimagedata'
+    mocked_open.assert_called_once_with(output_file, 'wb')
+    written = b''.join(c.args[0] for c in mocked_open.return_value.write.call_args_list)
+    assert written == b''.join(_IMAGE_CHUNKS) == b'mockimagedata'
     # Verify OpenAI call
-    mock_openai_client_instance.images.generate.assert_called_once_with(
+    mock_openai.images.generate.assert_called_once_with(
         model='dall-e-test',
         prompt=prompt,
         n=1,
@@ -88,91 +115,66 @@ def test_generate_image_success(mock_requests_get, openai_client_fixture, mock_o
     mock_requests_get.assert_called_once_with(mock_image_url, stream=True, timeout=60)
     assert "Image successfully downloaded and saved" in caplog.text
 
-@patch('requests.get')
-def test_generate_image_api_error(mock_requests_get, openai_client_fixture, mock_openai_client_instance, tmp_path, caplog):
-    """Test handling of OpenAI API errors during generation."""
-    # Configure mock OpenAI error
-    mock_openai_client_instance.images.generate.side_effect = openai.RateLimitError(
-        message="Rate limit exceeded", response=MagicMock(), body=None
-    )
-
-    prompt = "A test prompt"
-    output_file = tmp_path / "generated_image.png"
-
-    result_path = openai_client_fixture.generate_image(prompt, output_file)
+# --- Failure-path configurations (shared by the parametrized failure test) ---
 
-    assert result_path is None
-    assert not output_file.exists()
-    mock_requests_get.assert_not_called() # Download should not be attempted
-    assert "OpenAI API request exceeded rate limit" in caplog.text
-
-@patch('requests.get')
-def test_generate_image_download_error(mock_requests_get, openai_client_fixture, mock_openai_client_instance, tmp_path, caplog):
-    """Test handling of errors during image download."""
-    # Configure mock OpenAI response (success)
-    mock_image_url = "https://mock.openai.com/image.png"
+def _openai_returns_image_url(mock_openai):
+    """Makes images.generate succeed with a single image URL."""
     mock_openai_response = MagicMock()
-    mock_openai_response.data = [MagicMock(url=mock_image_url)]
-    mock_openai_client_instance.images.generate.return_value = mock_openai_response
+    mock_openai_response.data = [MagicMock(url="https://mock.openai.com/image.png")]
+    mock_openai.images.generate.return_value = mock_openai_response
 
-    # Configure mock download error
-    expected_error_msg = "Failed to connect"
-    mock_requests_get.side_effect = requests.exceptions.ConnectionError(expected_error_msg)
+def _configure_nothing(mock_openai, mock_requests_get, mocker):
+    """Input validation fails before any mock is used."""
+    return None
 
-    prompt = "A test prompt"
-    output_file = tmp_path / "generated_image.png"
+def _configure_rate_limited(mock_openai, mock_requests_get, mocker):
+    """OpenAI rejects the generation request."""
+    mock_openai.images.generate.side_effect = RateLimitError(
+        message="Rate limit exceeded", response=MagicMock(), body=None
+    )
+    return None
 
-    result_path = openai_client_fixture.generate_image(prompt, output_file)
+def _configure_download_error(mock_openai, mock_requests_get, mocker):
+    """Generation succeeds but the image download cannot connect."""
+    _openai_returns_image_url(mock_openai)
+    mock_requests_get.side_effect = RequestsConnectionError("Failed to connect")
+    return None
 
-    assert result_path is None
-    assert not output_file.exists() # Should not be created if download fails
-    mock_requests_get.assert_called_once()
-    # --- Start of Correction ---
-    # Check that the specific error message from the exception is logged
-    assert expected_error_msg in caplog.text
-    # Optionally, also check for the generic log prefix
-    assert "Failed to download image:" in caplog.text
-    # --- End of Correction ---
-
-@patch('requests.get')
-@patch('builtins.open') # Mock the built-in open function
-def test_generate_image_save_error(mock_open, mock_requests_get, openai_client_fixture, mock_openai_client_instance, tmp_path, caplog):
-    """Test handling of errors during file saving."""
-     # Configure mock OpenAI response (success)
-    mock_image_url = "https://mock.openai.com/image.png"
-    mock_openai_response = MagicMock()
-    mock_openai_response.data = [MagicMock(url=mock_image_url)]
-    mock_openai_client_instance.images.generate.return_value = mock_openai_response
-
-    # Configure mock download response (success)
+def _configure_save_error(mock_openai, mock_requests_get, mocker):
+    """Generation and download succeed but the file cannot be opened for writing."""
+    _openai_returns_image_url(mock_openai)
     mock_download_response = MagicMock()
     mock_download_response.raise_for_status.return_value = None
-    mock_download_response.iter_content.return_value = [b'mock', b'image', b'data']
+    mock_download_response.iter_content.side_effect = _stream_image_chunks
     mock_requests_get.return_value = mock_download_response
-
-    # Configure mock open to raise IOError
-    expected_error_msg = "Permission denied"
-    mock_open.side_effect = IOError(expected_error_msg)
-
-    prompt = "A test prompt"
-    output_file = tmp_path / "generated_image.png"
-
-    result_path = openai_client_fixture.generate_image(prompt, output_file)
+    return mocker.patch('builtins.open', side_effect=IOError("Permission denied")) # Mock the built-in open function
+
+@pytest.mark.parametrize("prompt, has_path, configure, expected_downloads, expected_logs", [
+    pytest.param("", True, _configure_nothing, 0,
+                 ["Image generation prompt cannot be empty"], id="empty_prompt"),
+    pytest.param("prompt", False, _configure_nothing, 0,
+                 ["Output path for saving the image cannot be empty"], id="empty_path"),
+    pytest.param("A test prompt", True, _configure_rate_limited, 0, # Download should not be attempted
+                 ["OpenAI API request exceeded rate limit"], id="api_error"),
+    pytest.param("A test prompt", True, _configure_download_error, 1,
+                 ["Failed to download image:", "Failed to connect"], id="download_error"),
+    pytest.param("A test prompt", True, _configure_save_error, 1,
+                 ["Failed to save image to {output_file}: Permission denied"], id="save_error"),
+])
+def test_generate_image_failure(prompt, has_path, configure, expected_downloads, expected_logs,
+                                mock_requests_get, openai_client_fixture, mock_openai_client_instance,
+                                tmp_path, caplog, mocker):
+    """Test invalid input and API/download/save errors all return None and log the cause."""
+    output_file = tmp_path / "generated_image.png" if has_path else None
+    mocked_open = configure(mock_openai_client_instance(), mock_requests_get, mocker)
+
+    result_path = openai_client_fixture.generate_image(prompt, output_file) # type: ignore
 
     assert result_path is None
-    mock_open.assert_called_once_with(output_file, 'wb')
-    # Check the log message includes the specific IO error
-    assert f"Failed to save image to {output_file}: {expected_error_msg}" in caplog.text
-
-def test_generate_image_empty_prompt(openai_client_fixture, tmp_path, caplog):
-    """Test generation with an empty prompt."""
-    output_file = tmp_path / "image.png"
-    result = openai_client_fixture.generate_image("", output_file)
-    assert result is None
-    assert "Image generation prompt cannot be empty" in caplog.text
-
-def test_generate_image_empty_path(openai_client_fixture, caplog):
-    """Test generation with an empty output path."""
-    result = openai_client_fixture.generate_image("prompt", None) # type: ignore
-    assert result is None
-    assert "Output path for saving the image cannot be empty" in caplog.text
\ No newline at end of file
+    assert mock_requests_get.call_count == expected_downloads
+    if output_file is not None:
+        assert not output_file.exists() # Should not be created on any failure
+    if mocked_open is not None:
+        mocked_open.assert_called_once_with(output_file, 'wb')
+    for expected_log in expected_logs:
+        assert expected_log.format(output_file=output_file) in caplog.text
@@ -1,13 +1,29 @@
 # tests/api/test_base_client.py
 
+import io
 import pytest
 import requests
 import time
-from unittest.mock import MagicMock, patch, call
+from types import MappingProxyType, SimpleNamespace
+from requests.exceptions import HTTPError, JSONDecodeError, RequestException, Timeout
+from unittest.mock import MagicMock
 from typing import Dict, Any
 
 # Module to test
-from src.api.base_client import BaseApiClient
+from src.api.base_client import BaseApiClient, HTTP_POOL_MAXSIZE
+
+# Public Session API, computed once: spec= with a class re-runs dir() on every mock created
+_SESSION_SPEC = [attr for attr in dir(requests.Session) if not attr.startswith('_')]
+
+# session.request kwargs for a bare _make_request call on concrete_client; tests override what differs
+_BASE_REQUEST_KWARGS = MappingProxyType({
+    'params': None,
+    'data': None,
+    'json': None,
+    'files': None,
+    'headers': {}, # From concrete_client.session.headers
+    'timeout': 10, # Default timeout
+})
 
 # --- Concrete Subclass for Testing ---
 
@@ -16,7 +32,7 @@ class ConcreteClient(BaseApiClient):
     def __init__(self, base_url="http://test.com", api_key=None, default_timeout=10):
         super().__init__(base_url, api_key, default_timeout)
         # Mock the session object directly on the instance for easier request mocking
-        self.session = MagicMock(spec=requests.Session)
+        self.session = MagicMock(spec=_SESSION_SPEC)
         self.session.headers = {} # Simulate session headers
 
     def _authenticate(self) -> Dict[str, Any]:
@@ -27,45 +43,65 @@ class ConcreteClient(BaseApiClient):
 
 # --- Fixtures ---
 
-@pytest.fixture
+@pytest.fixture(autouse=True)
+def no_sleep(monkeypatch):
+    """Replaces time.sleep with a no-op for every test; returns the list of requested delays."""
+    delays = []
+    monkeypatch.setattr(time, 'sleep', delays.append)
+    return delays
+
+@pytest.fixture(scope="module")
 def concrete_client():
-    """Provides an instance of the concrete client."""
+    """Provides an instance of the concrete client, shared by the module (see _reset_concrete_client)."""
     return ConcreteClient(base_url="http://test.com/api/")
 
+@pytest.fixture(autouse=True)
+def _reset_concrete_client(concrete_client):
+    """Clears the shared client's session mock after each test so no calls or side effects leak."""
+    yield
+    concrete_client.session.reset_mock(return_value=True, side_effect=True)
+    concrete_client.session.headers = {}
+
+def _raiser(error):
+    """Returns a zero-argument callable that raises `error`."""
+    def _raise():
+        raise error
+    return _raise
+
 @pytest.fixture
 def mock_response():
-    """Factory fixture to create mock requests.Response objects."""
+    """
+    Factory fixture to create lightweight requests.Response stand-ins. Only attribute access
+    and the json()/raise_for_status() calls are needed, so a SimpleNamespace replaces a spec'd MagicMock.
+    """
     def _create_mock_response(status_code=200, json_data=None, text_data=None, raise_for_status_error=None):
-        mock_resp = MagicMock(spec=requests.Response)
-        mock_resp.status_code = status_code
-        mock_resp.reason = "OK" if status_code < 400 else "Error" # Set reason based on status
-        mock_resp.text = text_data if text_data is not None else str(json_data or '') # Ensure text exists
+        mock_resp = SimpleNamespace(
+            status_code=status_code,
+            reason="OK" if status_code < 400 else "Error", # Set reason based on status
+            text=text_data if text_data is not None else str(json_data or ''), # Ensure text exists
+            headers={},
+        )
 
         if json_data is not None:
-            mock_resp.json.return_value = json_data
+            mock_resp.json = lambda: json_data
         else:
             # Simulate JSONDecodeError if no json_data is provided
-            mock_resp.json.side_effect = requests.exceptions.JSONDecodeError("No JSON object could be decoded", "doc", 0)
+            mock_resp.json = _raiser(JSONDecodeError("No JSON object could be decoded", "doc", 0))
 
-        # Configure raise_for_status mock
+        # Configure raise_for_status
         if raise_for_status_error:
-            # --- Start Correction for Failure 2 ---
             # Ensure the exception instance has the response attribute set
-            # Modify the actual exception instance passed in
-            if isinstance(raise_for_status_error, requests.exceptions.RequestException):
-                 # This check prevents errors if something else is passed as side_effect
+            if isinstance(raise_for_status_error, RequestException):
+                 # This check prevents errors if something else is passed in
                 raise_for_status_error.response = mock_resp
-            mock_resp.raise_for_status.side_effect = raise_for_status_error
-            # --- End Correction for Failure 2 ---
+            mock_resp.raise_for_status = _raiser(raise_for_status_error)
+        elif status_code >= 400:
+            # Default behavior: raise HTTPError (with the response attached) for >= 400 status codes
+            mock_resp.raise_for_status = _raiser(
+                HTTPError(f"{status_code} {mock_resp.reason}", response=mock_resp)
+            )
         else:
-            # Default behavior: raise HTTPError for >= 400 status codes
-            if status_code >= 400:
-                # Create the default error and attach the response
-                default_http_error = requests.exceptions.HTTPError(f"{status_code} {mock_resp.reason}", response=mock_resp)
-                default_http_error.response = mock_resp # Explicitly set response attr
-                mock_resp.raise_for_status.side_effect = default_http_error
-            else:
-                mock_resp.raise_for_status.return_value = None # No error for < 400 status codes
+            mock_resp.raise_for_status = lambda: None # No error for < 400 status codes
 
         return mock_resp
     return _create_mock_response
@@ -85,8 +121,7 @@ def test_base_client_init_no_base_url():
     with pytest.raises(ValueError, match="Base URL cannot be empty."):
         ConcreteClient(base_url="")
 
-@patch('time.sleep', return_value=None) # Mock time.sleep to avoid delays
-def test_make_request_success_json(mock_sleep, concrete_client, mock_response):
+def test_make_request_success_json(no_sleep, concrete_client, mock_response):
     """Test a successful request returning JSON."""
     expected_data = {"success": True, "data": [1, 2]}
     mock_resp = mock_response(status_code=200, json_data=expected_data)
@@ -97,19 +132,11 @@ def test_make_request_success_json(mock_sleep, concrete_client, mock_response):
     assert data == expected_data
     assert error is None
     concrete_client.session.request.assert_called_once_with(
-        method="GET",
-        url="http://test.com/api/items",
-        params={"id": 1},
-        data=None,
-        json=None,
-        files=None,
-        headers={}, # From concrete_client.session.headers
-        timeout=10 # Default timeout
+        **{**_BASE_REQUEST_KWARGS, 'method': "GET", 'url': "http://test.com/api/items", 'params': {"id": 1}}
     )
-    mock_sleep.assert_not_called()
+    assert no_sleep == []
 
-@patch('time.sleep', return_value=None)
-def test_make_request_success_no_json(mock_sleep, concrete_client, mock_response):
+def test_make_request_success_no_json(no_sleep, concrete_client, mock_response):
     """Test a successful request returning non-JSON content."""
     mock_resp = mock_response(status_code=204) # No content usually has no JSON
     concrete_client.session.request.return_value = mock_resp
@@ -119,12 +146,11 @@ def test_make_request_success_no_json(mock_sleep, concrete_client, mock_response
     assert data is None # No JSON data expected
     assert error is None # No error expected
     concrete_client.session.request.assert_called_once_with(
-        method="DELETE", url="http://test.com/api/items/1", params=None, data=None, json=None, files=None, headers={}, timeout=10
+        **{**_BASE_REQUEST_KWARGS, 'method': "DELETE", 'url': "http://test.com/api/items/1"}
     )
-    mock_sleep.assert_not_called()
+    assert no_sleep == []
 
-@patch('time.sleep', return_value=None)
-def test_make_request_http_error_4xx(mock_sleep, concrete_client, mock_response, caplog):
+def test_make_request_http_error_4xx(no_sleep, concrete_client, mock_response, caplog):
     """Test handling of a 4xx HTTP error (should not retry)."""
     error_text = "Not Found"
     mock_resp = mock_response(status_code=404, text_data=error_text)
@@ -137,64 +163,81 @@ def test_make_request_http_error_4xx(mock_sleep, concrete_client, mock_response,
     assert error == f"HTTP 404: {error_text}" # Check actual returned format
     # --- End Correction for Failure 1 ---
     concrete_client.session.request.assert_called_once() # Should only be called once
-    mock_sleep.assert_not_called() # No retries
+    assert no_sleep == [] # No retries
     assert f"HTTP error: 404 Error - {error_text}" in caplog.text # Log message format check
 
-@patch('time.sleep', return_value=None)
-def test_make_request_http_error_5xx_retry_success(mock_sleep, concrete_client, mock_response):
-    """Test retry logic for 5xx errors followed by success."""
-    fail_response_1 = mock_response(status_code=500, text_data="Internal Server Error")
-    fail_response_2 = mock_response(status_code=503, text_data="Service Unavailable")
-    success_response = mock_response(status_code=200, json_data={"status": "ok"})
+_PERSISTENT_TIMEOUT = Timeout("Request timed out persistently")
+
+@pytest.mark.parametrize("request_kwargs, side_effects, expected_data, expected_error, expected_calls, expected_sleeps", [
+    pytest.param(
+        # The mock_response factory configures raise_for_status side effects for 5xx
+        {'json_payload': {"name": "test"}, 'retries': 2}, # Allow 2 retries (3 attempts total)
+        lambda make: [make(status_code=500, text_data="Internal Server Error"),
+                      make(status_code=503, text_data="Service Unavailable"),
+                      make(status_code=200, json_data={"status": "ok"})],
+        {"status": "ok"}, None, 3, [0.5, 1.0], # Backoff before 2nd and 3rd attempts: 0.5 * 2^0, 0.5 * 2^1
+        id="5xx_retry_success"),
+    pytest.param(
+        {'retries': 3}, # Allow 3 retries (4 attempts); succeeds on the 3rd
+        lambda make: [Timeout("Request timed out"), Timeout("Request timed out"),
+                      make(status_code=200, json_data={"status": "ok"})],
+        {"status": "ok"}, None, 3, [0.5, 1.0],
+        id="timeout_retry_success"),
+    pytest.param(
+        {'retries': 2}, # Allow 2 retries (3 attempts), all of which time out
+        lambda make: _PERSISTENT_TIMEOUT,
+        None, f"Request failed after 3 attempts: {_PERSISTENT_TIMEOUT}", 3, [0.5, 1.0],
+        id="persistent_failure"),
+])
+def test_make_request_retries(request_kwargs, side_effects, expected_data, expected_error, expected_calls, expected_sleeps,
+                              no_sleep, concrete_client, mock_response, caplog):
+    """Test retry logic for 5xx and timeout failures, both recovering and exhausting the retries."""
+    concrete_client.session.request.side_effect = side_effects(mock_response)
+
+    data, error = concrete_client._make_request("POST", "/create", **request_kwargs)
 
-    # The mock_response fixture now automatically configures raise_for_status side effects for 5xx
-    concrete_client.session.request.side_effect = [
-        fail_response_1,
-        fail_response_2,
-        success_response
-    ]
+    assert data == expected_data
+    if expected_error is None:
+        assert error is None
+    else:
+        assert expected_error in error
+        assert expected_error in caplog.text
+    assert concrete_client.session.request.call_count == expected_calls
+    assert no_sleep == expected_sleeps
+
+def test_make_request_429_retries_after_server_delay(no_sleep, concrete_client, mock_response):
+    """Test a 429 is retried (unlike other 4xx), waiting for the Retry-After delay when it is longer."""
+    rate_limited = mock_response(status_code=429, text_data="Too Many Requests")
+    rate_limited.headers = {'Retry-After': '3'}
+    rate_limited_no_header = mock_response(status_code=429, text_data="Too Many Requests") # headers == {}
+    success_response = mock_response(status_code=200, json_data={"status": "ok"})
+    concrete_client.session.request.side_effect = [rate_limited, rate_limited_no_header, success_response]
 
-    data, error = concrete_client._make_request("POST", "/create", json_payload={"name": "test"}, retries=2) # Allow 2 retries (3 attempts total)
+    data, error = concrete_client._make_request("POST", "/upload", retries=2)
 
     assert data == {"status": "ok"}
     assert error is None
     assert concrete_client.session.request.call_count == 3
-    assert mock_sleep.call_count == 2 # Called before 2nd and 3rd attempts
-    # Check backoff delay calculation (0.5 * 2^0, 0.5 * 2^1)
-    mock_sleep.assert_has_calls([call(0.5), call(1.0)])
-
-@patch('time.sleep', return_value=None)
-def test_make_request_timeout_retry_success(mock_sleep, concrete_client, mock_response):
-    """Test retry logic for Timeout errors followed by success."""
-    timeout_error = requests.exceptions.Timeout("Request timed out")
-    success_response = mock_response(status_code=200, json_data={"status": "ok"})
+    assert no_sleep == [3.0, 1.0]  # Retry-After, then normal backoff
 
-    concrete_client.session.request.side_effect = [
-        timeout_error,
-        timeout_error,
-        success_response
-    ]
+def test_make_request_retry_resends_full_file_body(no_sleep, concrete_client, mock_response):
+    """Test a retried upload rewinds the file so the second attempt sends the same bytes, not an empty body."""
+    media = io.BytesIO(b"image-bytes")
+    responses = iter([mock_response(status_code=500, text_data="Server Error"),
+                      mock_response(status_code=200, json_data={"media_id": "m1"})])
+    sent_bodies = []
 
-    data, error = concrete_client._make_request("GET", "/data", retries=3) # Allow 3 retries (4 attempts)
+    def _send(**kwargs):
+        sent_bodies.append(kwargs['files']['media'][1].read())  # requests reads the file to the end
+        return next(responses)
 
-    assert data == {"status": "ok"}
-    assert error is None
-    assert concrete_client.session.request.call_count == 3 # Succeeded on 3rd attempt
-    assert mock_sleep.call_count == 2 # Called before 2nd and 3rd attempts
-
-@patch('time.sleep', return_value=None)
-def test_make_request_persistent_failure(mock_sleep, concrete_client, mock_response, caplog):
-    """Test when retries are exhausted."""
-    timeout_error = requests.exceptions.Timeout("Request timed out persistently")
-    concrete_client.session.request.side_effect = timeout_error # Always raise Timeout
+    concrete_client.session.request.side_effect = _send
 
-    data, error = concrete_client._make_request("GET", "/flaky", retries=2) # Allow 2 retries (3 attempts)
+    data, error = concrete_client._make_request("POST", "/upload", files={'media': ("x.png", media)}, retries=1)
 
-    assert data is None
-    assert f"Request failed after 3 attempts: {timeout_error}" in error
-    assert concrete_client.session.request.call_count == 3
-    assert mock_sleep.call_count == 2
-    assert f"Request failed after 3 attempts: {timeout_error}" in caplog.text
+    assert data == {"media_id": "m1"}
+    assert error is None
+    assert sent_bodies == [b"image-bytes", b"image-bytes"]
 
 def test_make_request_custom_params_headers_timeout(concrete_client, mock_response):
     """Test passing custom parameters, headers, and timeout."""
@@ -208,17 +251,25 @@ def test_make_request_custom_params_headers_timeout(concrete_client, mock_respon
     concrete_client._make_request("GET", "/list", params=custom_params, headers=custom_headers, timeout=custom_timeout)
 
     concrete_client.session.request.assert_called_once_with(
-        method="GET",
-        url="http://test.com/api/list",
-        params=custom_params,
-        data=None,
-        json=None,
-        files=None,
-        headers=custom_headers, # Should include custom header
-        timeout=custom_timeout # Should use custom timeout
+        **{**_BASE_REQUEST_KWARGS, 'method': "GET", 'url': "http://test.com/api/list", 'params': custom_params,
+           'headers': custom_headers, # Should include custom header
+           'timeout': custom_timeout} # Should use custom timeout
     )
 
 def test_close_session(concrete_client):
     """Test the close_session method."""
     concrete_client.close_session()
-    concrete_client.session.close.assert_called_once()
\ No newline at end of file
+    concrete_client.session.close.assert_called_once()
+
+def test_session_uses_pooled_adapter_without_urllib3_retries():
+    """The real session keeps a keep-alive pool per host and leaves retries to _make_request."""
+    class PlainClient(BaseApiClient):
+        def _authenticate(self) -> Dict[str, Any]:
+            return {}
+
+    client = PlainClient(base_url="https://api.example.com")
+    for url in ("https://api.example.com/x", "http://api.example.com/x"):
+        adapter = client.session.get_adapter(url)
+        assert adapter._pool_maxsize == HTTP_POOL_MAXSIZE
+        assert adapter.max_retries.total == 0
+
@@ -1,10 +1,13 @@
 import pytest
+import json
 import time
-from unittest.mock import MagicMock, patch, call
+import threading
+import os
+from unittest.mock import MagicMock, patch, call, ANY
 from pathlib import Path
 
 # Modules to test
-from src.api.wechat.client import WeChatClient, ENDPOINT_ACCESS_TOKEN, ENDPOINT_UPLOAD_MEDIA, ENDPOINT_ADD_DRAFT, ENDPOINT_UPDATE_DRAFT, ENDPOINT_BATCHGET_DRAFT
+from src.api.wechat.client import WeChatClient, ENDPOINT_ACCESS_TOKEN, ENDPOINT_UPLOAD_MEDIA, ENDPOINT_ADD_DRAFT, ENDPOINT_UPDATE_DRAFT, ENDPOINT_BATCHGET_DRAFT, UPLOAD_READ_BUFFER_SIZE, JSON_UTF8_HEADERS
 from src.core import settings
 
 # --- Fixtures ---
@@ -120,6 +123,29 @@ def test_get_valid_access_token_refresh(mock_time, wechat_client_fixture):
     second_call = call('GET', ENDPOINT_ACCESS_TOKEN, params={'grant_type': 'client_credential', 'appid': 'test-app-id', 'secret': 'test-app-secret'})
     wechat_client_fixture._make_request.assert_has_calls([first_call, second_call]) # Check both calls happened
 
+def test_get_valid_access_token_refreshes_once_across_threads(wechat_client_fixture):
+    """Concurrent callers with an expired token trigger a single token fetch."""
+    fetch_started = threading.Event()
+    release_fetch = threading.Event()
+
+    def slow_token_fetch(*args, **kwargs):
+        fetch_started.set()
+        release_fetch.wait(timeout=5)
+        return {"access_token": "shared_token", "expires_in": 7200}, None
+
+    wechat_client_fixture._make_request.side_effect = slow_token_fetch
+    tokens = []
+    threads = [threading.Thread(target=lambda: tokens.append(wechat_client_fixture._get_valid_access_token())) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    fetch_started.wait(timeout=5)
+    release_fetch.set()
+    for thread in threads:
+        thread.join(timeout=5)
+
+    assert tokens == ["shared_token"] * 4
+    assert wechat_client_fixture._make_request.call_count == 1
+
 def test_get_valid_access_token_fetch_fails(wechat_client_fixture, caplog):
     """Test that ConnectionError is raised if token fetch fails during _authenticate."""
     wechat_client_fixture._make_request.return_value = (None, "Fetch Failed") # Mock token fetch failure
@@ -151,7 +177,7 @@ def test_upload_media_success(mock_open, wechat_client_fixture, tmp_path):
     result = wechat_client_fixture.upload_media(str(file_path), media_type='image', is_permanent=True)
 
     assert result == mock_api_response
-    mock_open.assert_called_once_with(str(file_path), 'rb')
+    mock_open.assert_called_once_with(str(file_path), 'rb', buffering=UPLOAD_READ_BUFFER_SIZE)
     wechat_client_fixture._make_request.assert_called_once()
     args, kwargs = wechat_client_fixture._make_request.call_args
     assert args[0] == 'POST'
@@ -160,6 +186,20 @@ def test_upload_media_success(mock_open, wechat_client_fixture, tmp_path):
     assert 'media' in kwargs['files']
     assert kwargs['files']['media'][0] == str(file_path) # Check filename passed to requests
 
+def test_upload_media_hints_sequential_read(wechat_client_fixture, tmp_path, mocker):
+    """Test the media file gets a sequential-read hint before upload, where supported."""
+    if not hasattr(os, 'posix_fadvise'):
+        pytest.skip("posix_fadvise not available on this platform")
+    file_path = tmp_path / "video.mp4"
+    file_path.write_bytes(b"data")
+    wechat_client_fixture._access_token = "valid_token"
+    wechat_client_fixture._token_expiry_time = time.time() + 3600
+    wechat_client_fixture._make_request.return_value = ({"media_id": "m1"}, None)
+    fadvise = mocker.patch('src.api.wechat.client.os.posix_fadvise')
+
+    assert wechat_client_fixture.upload_media(str(file_path), 'video')["media_id"] == "m1"
+    fadvise.assert_called_once_with(ANY, 0, 0, os.POSIX_FADV_SEQUENTIAL)
+
 def test_upload_media_file_not_found(wechat_client_fixture, tmp_path, caplog):
     """Test upload when the media file does not exist."""
     wechat_client_fixture._access_token = "valid_token"
@@ -207,7 +247,21 @@ def test_add_draft_success(wechat_client_fixture):
     assert args[0] == 'POST'
     assert args[1] == ENDPOINT_ADD_DRAFT
     assert kwargs['params'] == {'access_token': 'valid_token'}
-    assert kwargs['json_payload'] == {'articles': [article_data]}
+    assert json.loads(kwargs['data']) == {'articles': [article_data]}
+    assert kwargs['headers'] == JSON_UTF8_HEADERS
+
+def test_add_draft_sends_raw_utf8_body(wechat_client_fixture):
+    """Test non-ASCII draft content is sent as UTF-8 bytes rather than \\u escapes."""
+    wechat_client_fixture._access_token = "valid_token"
+    wechat_client_fixture._token_expiry_time = time.time() + 1000
+    wechat_client_fixture._make_request.return_value = ({"media_id": "draft_1"}, None)
+
+    wechat_client_fixture.add_draft({"title": "标题", "content": "<p>你好</p>"})
+
+    body = wechat_client_fixture._make_request.call_args.kwargs['data']
+    assert isinstance(body, bytes)
+    assert "<p>你好</p>".encode('utf-8') in body
+    assert b"\\u" not in body
 
 def test_add_draft_api_error(wechat_client_fixture, caplog):
     """Test adding draft failure due to API error."""
@@ -240,7 +294,8 @@ def test_update_draft_success(wechat_client_fixture):
     assert args[0] == 'POST'
     assert args[1] == ENDPOINT_UPDATE_DRAFT
     assert kwargs['params'] == {'access_token': 'valid_token'}
-    assert kwargs['json_payload'] == {"media_id": draft_media_id, "index": 0, "articles": article_data}
+    assert json.loads(kwargs['data']) == {"media_id": draft_media_id, "index": 0, "articles": article_data}
+    assert kwargs['headers'] == JSON_UTF8_HEADERS
 
 
 def test_update_draft_api_error(wechat_client_fixture, caplog):
@@ -1,5 +1,6 @@
 # tests/core/test_article_model.py
 
+import sys
 import pytest
 from dataclasses import is_dataclass, fields
 
@@ -14,6 +15,16 @@ def test_dataclasses_defined():
     assert is_dataclass(ContentElement)
     assert is_dataclass(Article)
 
+@pytest.mark.skipif(sys.version_info < (3, 10), reason="dataclass slots require Python 3.10+")
+def test_per_item_dataclasses_use_slots():
+    """MediaPlaceholder/ContentElement are allocated per item and should not carry a __dict__."""
+    ph = MediaPlaceholder(original_tag="t", placeholder_id="id")
+    elem = ContentElement(type="p", content="text")
+    assert not hasattr(ph, '__dict__')
+    assert not hasattr(elem, '__dict__')
+    with pytest.raises(AttributeError):
+        ph.unknown_attribute = 1
+
 def test_media_placeholder_init():
     """Test initialization of MediaPlaceholder."""
     tag = "![alt](placeholder:id.png)"
@@ -94,6 +105,21 @@ def test_article_get_placeholder_by_id():
     empty_article = Article(title="Empty")
     assert empty_article.get_placeholder_by_id("id1") is None
 
+def test_article_media_soa():
+    """Test the column-wise media view mirrors media_placeholders and is cached."""
+    ph1 = MediaPlaceholder(original_tag="t1", placeholder_id="a.png", alt_text="A")
+    ph2 = MediaPlaceholder(original_tag="t2", placeholder_id="b.mp4", media_type="video", file_path="./b.mp4")
+    article = Article(title="Test", media_placeholders=[ph1, ph2])
+
+    soa = article.media_soa
+    assert soa.ids == ["a.png", "b.mp4"]
+    assert soa.paths == [None, "./b.mp4"]
+    assert soa.types == ["image", "video"]
+    assert soa.alts == ["A", ""]
+    assert [i for i, t in enumerate(soa.types) if t == "video"] == [1]
+    assert article.media_soa is soa
+    assert Article(title="Empty").media_soa.ids == []
+
 def test_article_get_content_as_text():
     """Test the get_content_as_text method."""
     elem_h1 = ContentElement(type="h1", content="Main Title")
@@ -126,4 +152,13 @@ print('hello')"""
 def test_article_get_content_as_text_empty():
     """Test get_content_as_text with no content elements."""
     article = Article(title="Empty")
-    assert article.get_content_as_text() == ""
\ No newline at end of file
+    assert article.get_content_as_text() == ""
+
+def test_article_get_content_as_text_skips_non_text_html_element():
+    """An 'html' element without string content contributes no text (not the string 'None')."""
+    article = Article(
+        title="Parsed",
+        content_elements=[ContentElement(type="html", content=None, html_content="<p>Hi</p>"),
+                          ContentElement(type="h2", content="Section")]
+    )
+    assert article.get_content_as_text() == "Section"
@@ -53,6 +53,27 @@ Paragraph content here.
     return md_file
 
 
+@pytest.fixture
+def sample_md_with_media(tmp_path):
+    """Creates a sample MD file mixing custom placeholders, standard links and duplicates."""
+    content = """---
+title: Media Article
+---
+
+![Custom img](placeholder:content_img_1.png)
+
+![ Standard cat ](./images/cat.gif)
+
+![Clip](placeholder:video1.mp4)
+
+![Duplicate standard path](./images/cat.gif)
+![Duplicate placeholder ID](placeholder:content_img_1.png)
+"""
+    md_file = tmp_path / "media_article.md"
+    md_file.write_text(content, encoding='utf-8')
+    return md_file
+
+
 # --- Test Class ---
 
 class TestMarkdownParser:
@@ -85,4 +106,163 @@ class TestMarkdownParser:
         assert 'author' in article.metadata, "Author key should be in metadata"
         assert article.metadata['author'] == "Explicit Author From Frontmatter"
 
+    def test_parse_media_placeholders(self, md_parser, sample_md_with_media, mock_settings):
+        """Test custom and standard media references are extracted once each."""
+        article = md_parser.parse_file(sample_md_with_media)
+
+        placeholders = {p.placeholder_id: p for p in article.media_placeholders}
+        assert len(article.media_placeholders) == 3  # Duplicates skipped
+        assert set(placeholders) == {"content_img_1.png", "images/cat.gif", "video1.mp4"}
+
+        assert placeholders["content_img_1.png"].media_type == "image"
+        assert placeholders["content_img_1.png"].file_path is None
+        assert placeholders["content_img_1.png"].alt_text == "Custom img"
+
+        assert placeholders["images/cat.gif"].file_path == "./images/cat.gif"
+        assert placeholders["images/cat.gif"].alt_text == "Standard cat"
+
+        assert placeholders["video1.mp4"].media_type == "video"
+
+    def test_parse_missing_file_returns_none(self, md_parser, tmp_path, mock_settings, caplog):
+        """Test a missing file or a directory path is reported and yields None."""
+        assert md_parser.parse_file(tmp_path / "does_not_exist.md") is None
+        assert md_parser.parse_file(tmp_path) is None
+        assert "Markdown input file not found or is not a file" in caplog.text
+
+    def test_parser_reuses_markdown_converter_between_files(self, md_parser, tmp_path, mock_settings):
+        """Test the cached converter is reset so one file's state does not leak into the next."""
+        first = tmp_path / "first.md"
+        first.write_text("# First\n\nText with a note.[^1]\n\n[^1]: Footnote one.\n", encoding='utf-8')
+        second = tmp_path / "second.md"
+        second.write_text("# Second\n\nPlain text.\n", encoding='utf-8')
+
+        converter = md_parser._md
+        md_parser.parse_file(first)
+        article = md_parser.parse_file(second)
+
+        assert md_parser._md is converter
+        html = article.content_elements[0].html_content
+        assert "Plain text." in html
+        assert "Footnote one." not in html
+
+    def test_parse_h1_title_found_in_media_scan(self, md_parser, tmp_path, mock_settings):
+        """Test the first H1 is used as title and media on and after it are still found."""
+        md_file = tmp_path / "h1_article.md"
+        md_file.write_text(
+            "Intro line.\n\n# Real Title ![Logo](placeholder:logo.png)\n\n"
+            "# Second H1\n\n![Pic](./pic.jpg)\n",
+            encoding='utf-8'
+        )
+
+        article = md_parser.parse_file(md_file)
+
+        assert article.title == "Real Title ![Logo](placeholder:logo.png)"
+        assert [p.placeholder_id for p in article.media_placeholders] == ["logo.png", "pic.jpg"]
+
+    def test_media_type_from_path(self, md_parser):
+        """Test media type detection by (case-insensitive) file extension."""
+        assert md_parser._get_media_type_from_path("clips/Intro.MKV") == "video"
+        assert md_parser._get_media_type_from_path("clip.wmv") == "video"
+        assert md_parser._get_media_type_from_path("./images/photo.PNG") == "image"
+        assert md_parser._get_media_type_from_path("no_extension") == "image"
+
+    def test_parse_keeps_raw_markdown_only_on_request(self, md_parser, sample_md_with_media, mock_settings):
+        """Test raw Markdown is dropped by default and kept with keep_raw=True."""
+        assert md_parser.parse_file(sample_md_with_media).raw_markdown is None
+
+        article = md_parser.parse_file(sample_md_with_media, keep_raw=True)
+        assert "placeholder:video1.mp4" in article.raw_markdown
+
+    def test_parse_files_keeps_input_order(self, md_parser, sample_md_with_media, sample_md_with_frontmatter_author, tmp_path, mock_settings):
+        """Test batch parsing returns one result per path, in order, with None for failures."""
+        paths = [sample_md_with_media, tmp_path / "missing.md", sample_md_with_frontmatter_author]
+
+        for workers in (1, 2):
+            articles = md_parser.parse_files(paths, workers=workers)
+
+            assert len(articles) == 3
+            assert articles[1] is None
+            assert len(articles[0].media_placeholders) == 3
+            assert articles[2].metadata['author'] == "Explicit Author From Frontmatter"
+
+    def test_parse_rewrites_local_image_links_to_placeholders(self, md_parser, tmp_path, mock_settings):
+        """Test local standard images are emitted as placeholder: sources; remote links are kept."""
+        md_file = tmp_path / "links.md"
+        md_file.write_text(
+            "# Links\n\n![Cat](./images/cat.gif)\n\n![Remote](https://example.com/dog.png)\n",
+            encoding='utf-8'
+        )
+
+        article = md_parser.parse_file(md_file)
+
+        html = article.content_elements[0].html_content
+        assert 'src="placeholder:images/cat.gif"' in html
+        assert 'src="https://example.com/dog.png"' in html
+        assert article.get_placeholder_by_id("images/cat.gif").file_path == "./images/cat.gif"
+
+    def test_parse_ignores_h1_beyond_title_window(self, md_parser, tmp_path, mock_settings):
+        """Test an H1 far down a long document is not used as the title."""
+        md_file = tmp_path / "late_heading.md"
+        md_file.write_text(("Filler text line.\n" * 400) + "# Late Heading\n\n![Pic](./pic.jpg)\n", encoding='utf-8')
+
+        article = md_parser.parse_file(md_file)
+
+        assert article.title == "late_heading"
+        assert [p.placeholder_id for p in article.media_placeholders] == ["pic.jpg"]
+
+    def test_parse_trims_whitespace_inside_media_tags(self, md_parser, tmp_path, mock_settings):
+        """Test padding inside the brackets/parentheses is not part of alt text, IDs or paths."""
+        md_file = tmp_path / "padded.md"
+        md_file.write_text("![ Logo ]( placeholder: logo.png )\n\n![  Cat ](  ./images/cat.gif  )\n\n![Empty](  )\n", encoding='utf-8')
+
+        article = md_parser.parse_file(md_file)
+
+        logo, cat = article.media_placeholders
+        assert (logo.placeholder_id, logo.alt_text, logo.file_path) == ("logo.png", "Logo", None)
+        assert (cat.placeholder_id, cat.alt_text, cat.file_path) == ("images/cat.gif", "Cat", "./images/cat.gif")
+
+    def test_parse_same_filename_in_different_directories_gets_distinct_ids(self, md_parser, tmp_path, mock_settings):
+        """Test local images sharing a basename get separate placeholders and separate rewritten sources."""
+        md_file = tmp_path / "same_name.md"
+        md_file.write_text("![a](img/x.png)\n\n![b](other/x.png)\n\n![c](./img/x.png)\n", encoding='utf-8')
+
+        article = md_parser.parse_file(md_file)
+
+        assert [(p.placeholder_id, p.file_path) for p in article.media_placeholders] == [
+            ("img/x.png", "img/x.png"), ("other/x.png", "other/x.png")  # ./img/x.png is the same file
+        ]
+        html = article.content_elements[0].html_content
+        assert html.count('src="placeholder:img/x.png"') == 2
+        assert html.count('src="placeholder:other/x.png"') == 1
+
+    def test_parse_strips_link_title_from_media_path(self, md_parser, tmp_path, mock_settings):
+        """Test a link title is not part of the path/ID and is kept on the rewritten image."""
+        md_file = tmp_path / "titled.md"
+        md_file.write_text('![c](img/y.png "Cap")\n\n![d](placeholder:z.png \'Zed\')\n', encoding='utf-8')
+
+        article = md_parser.parse_file(md_file)
+
+        y, z = article.media_placeholders
+        assert (y.placeholder_id, y.file_path) == ("img/y.png", "img/y.png")
+        assert (z.placeholder_id, z.file_path) == ("z.png", None)
+        html = article.content_elements[0].html_content
+        assert 'src="placeholder:img/y.png" title="Cap"' in html
+        assert 'src="placeholder:z.png" title="Zed"' in html
+
+    def test_scan_content_without_media_returns_text_unchanged(self, md_parser, mocker):
+        """Test text with no image syntax skips the media regex and comes back as-is."""
+        media_search = mocker.patch('src.parsing.md_parser.MEDIA_RE')
+        text = "Plain paragraph with [a link](https://example.com) and no images."
+
+        assert md_parser._scan_content(text) == (None, [], text)
+        media_search.search.assert_not_called()
+
+    def test_scan_content_keeps_document_order_and_skips_duplicates(self, md_parser):
+        """Test custom and standard media come back in document order, each ID once."""
+        text = "![a](placeholder:one.png)\n![b](pics/two.mp4)\n![c](placeholder:one.png)\n![d](./pics/two.mp4)\n"
+
+        _, placeholders, _ = md_parser._scan_content(text)
+
+        assert [(p.placeholder_id, p.media_type) for p in placeholders] == [("one.png", "image"), ("pics/two.mp4", "video")]
+
     # Add more tests here for other scenarios (H1 title, cover images, placeholders etc.)
\ No newline at end of file
@@ -1,7 +1,11 @@
+import hashlib
+import threading
+import os
 import pytest
 from pathlib import Path
 from unittest.mock import MagicMock, call  # Use MagicMock for flexible mocking
 
+from src.api.base_client import HTTP_POOL_MAXSIZE
 from src.core.article_model import Article, MediaPlaceholder
 from src.platforms.wechat.media_uploader import WeChatMediaUploader
 
@@ -38,6 +42,7 @@ def mock_settings(monkeypatch, tmp_path):
         INPUT_COVER_IMAGE_DIR = cover_dir
         INPUT_CONTENT_IMAGE_DIR = content_dir
         INPUT_DIR = input_dir  # Base dir for resolving MD paths
+        WECHAT_UPLOAD_CONCURRENCY = 4
 
     monkeypatch.setattr('src.platforms.wechat.media_uploader.settings', MockSettings)
     return MockSettings
@@ -46,15 +51,15 @@ def mock_settings(monkeypatch, tmp_path):
 def sample_article_for_upload(mock_settings):
     """Creates an Article object ready for upload testing."""
     # Create dummy files that should be found
-    (mock_settings.INPUT_COVER_IMAGE_DIR / "cover_by_id.jpg").touch()
+    (mock_settings.INPUT_COVER_IMAGE_DIR / "cover_by_id.jpg").write_bytes(b"cover-by-id")
     
     # Ensure the 'rel_content' directory exists before touching files
     rel_content_dir = mock_settings.INPUT_DIR / "rel_content"
     rel_content_dir.mkdir(parents=True, exist_ok=True)
 
-    (rel_content_dir / "standard_img.png").touch()  # Relative to INPUT_DIR
-    (mock_settings.INPUT_CONTENT_IMAGE_DIR / "content_by_id.gif").touch()
-    (mock_settings.INPUT_COVER_IMAGE_DIR / "cover_by_path.webp").touch()  # For cover_image_path
+    (rel_content_dir / "standard_img.png").write_bytes(b"standard-img")  # Relative to INPUT_DIR
+    (mock_settings.INPUT_CONTENT_IMAGE_DIR / "content_by_id.gif").write_bytes(b"content-by-id")
+    (mock_settings.INPUT_COVER_IMAGE_DIR / "cover_by_path.webp").write_bytes(b"cover-by-path")  # For cover_image_path
     
     # Provide the `original_tag` for the MediaPlaceholder initialization
     cover_placeholder_by_id = MediaPlaceholder(placeholder_id="cover_by_id.jpg", media_type="thumb", 
@@ -156,3 +161,193 @@ class TestWeChatMediaUploader:
         ]
         mock_wechat_client.upload_media.assert_has_calls(expected_calls, any_order=True)  # Order might vary slightly
         assert mock_wechat_client.upload_media.call_count == 3
+
+    def test_content_media_uploaded_concurrently(self, mock_wechat_client, mock_settings, sample_article_for_upload):
+        """Test content uploads overlap instead of running one after another (cover stays first)."""
+        uploader = WeChatMediaUploader(mock_wechat_client)
+        upload_success = mock_wechat_client.upload_media.side_effect
+        both_in_flight = threading.Barrier(2, timeout=5)  # Only passes if two content uploads run at once
+
+        def upload_waiting_for_peer(file_path, media_type, is_permanent):
+            if media_type != 'thumb':
+                both_in_flight.wait()
+            return upload_success(file_path, media_type, is_permanent)
+
+        mock_wechat_client.upload_media.side_effect = upload_waiting_for_peer
+
+        assert uploader.upload_article_media(sample_article_for_upload) is True
+        assert mock_wechat_client.upload_media.call_args_list[0].kwargs['media_type'] == 'thumb'
+        assert sample_article_for_upload.get_placeholder_by_id("standard_img.png").uploaded_media_id == "perm_id_for_standard_img.png"
+        assert sample_article_for_upload.get_placeholder_by_id("content_by_id.gif").uploaded_media_id == "perm_id_for_content_by_id.gif"
+
+    def test_content_upload_raising_counted_as_failure(self, mock_wechat_client, mock_settings, sample_article_for_upload, caplog):
+        """Test an exception from one content upload does not abort the rest of the batch."""
+        uploader = WeChatMediaUploader(mock_wechat_client)
+        upload_success = mock_wechat_client.upload_media.side_effect
+
+        def upload_raising_for_gif(file_path, media_type, is_permanent):
+            if file_path.endswith("content_by_id.gif"):
+                raise ConnectionError("connection reset")
+            return upload_success(file_path, media_type, is_permanent)
+
+        mock_wechat_client.upload_media.side_effect = upload_raising_for_gif
+
+        assert uploader.upload_article_media(sample_article_for_upload) is True
+        assert sample_article_for_upload.get_placeholder_by_id("standard_img.png").uploaded_media_id == "perm_id_for_standard_img.png"
+        assert sample_article_for_upload.get_placeholder_by_id("content_by_id.gif").uploaded_media_id is None
+        assert "Unexpected error uploading content media 'content_by_id.gif'" in caplog.text
+        assert "2/4 ok, 2 failed" in caplog.text
+
+    def test_upload_concurrency_capped_by_connection_pool(self, mock_wechat_client, mock_settings, monkeypatch):
+        """Test the configured worker count never exceeds the pooled HTTP connections."""
+        monkeypatch.setattr(mock_settings, 'WECHAT_UPLOAD_CONCURRENCY', 2)
+        assert WeChatMediaUploader(mock_wechat_client).upload_concurrency == 2
+        monkeypatch.setattr(mock_settings, 'WECHAT_UPLOAD_CONCURRENCY', HTTP_POOL_MAXSIZE + 10)
+        assert WeChatMediaUploader(mock_wechat_client).upload_concurrency == HTTP_POOL_MAXSIZE
+
+    def test_file_lookups_cached_within_run_and_reset_between_runs(self, mock_wechat_client, mock_settings, sample_article_for_upload):
+        """Test is_file results are memoized, but a file added after a run is found by the next one."""
+        uploader = WeChatMediaUploader(mock_wechat_client)
+        late_file = mock_settings.INPUT_CONTENT_IMAGE_DIR / "missing_file.bmp"
+        assert uploader._is_file(late_file) is False
+        late_file.write_bytes(b"late-file")
+        assert uploader._is_file(late_file) is False  # Cached until the next run
+
+        assert uploader.upload_article_media(sample_article_for_upload) is True
+        missing = sample_article_for_upload.get_placeholder_by_id("missing_file.bmp")
+        assert missing.uploaded_media_id == "perm_id_for_missing_file.bmp"
+
+    def test_file_digest_streams_content_in_chunks(self, mock_wechat_client, tmp_path, monkeypatch):
+        """Test the chunked digest matches hashing the whole file at once, and includes the size."""
+        monkeypatch.setattr('src.platforms.wechat.media_uploader.HASH_CHUNK_SIZE', 4)
+        media_file = tmp_path / "chunked.png"
+        media_file.write_bytes(b"0123456789")
+        uploader = WeChatMediaUploader(mock_wechat_client)
+
+        expected = hashlib.blake2b(b"0123456789", digest_size=16).digest()
+        assert uploader._file_digest(media_file) == (10, expected)
+
+    def test_cover_fallback_uses_first_file_in_cover_dir(self, mock_wechat_client, mock_settings, sample_article_no_cover_ref):
+        """Test an article without a cover reference falls back to a file in the cover directory."""
+        for cover in mock_settings.INPUT_COVER_IMAGE_DIR.iterdir():
+            cover.unlink()
+        (mock_settings.INPUT_COVER_IMAGE_DIR / ".hidden.jpg").write_bytes(b"hidden")
+        (mock_settings.INPUT_COVER_IMAGE_DIR / "only_cover.png").write_bytes(b"only-cover")
+        uploader = WeChatMediaUploader(mock_wechat_client)
+
+        assert uploader.upload_article_media(sample_article_no_cover_ref) is True
+        cover = sample_article_no_cover_ref.cover_image_placeholder
+        assert cover.placeholder_id == "only_cover.png"
+        assert cover.uploaded_media_id == "thumb_id_for_only_cover.png"
+
+    def test_cover_fallback_picks_file_by_name_not_listing_order(self, mock_wechat_client, mock_settings, monkeypatch):
+        """Test the fallback cover is the name-sorted first file whatever order the directory lists in."""
+        cover_dir = mock_settings.INPUT_COVER_IMAGE_DIR
+        for cover in cover_dir.iterdir():
+            cover.unlink()
+        for name in ("b_cover.png", "a_cover.jpg", "c_cover.png"):
+            (cover_dir / name).write_bytes(name.encode())
+        (cover_dir / "a_a_dir.d").mkdir()  # Sorts first but is not a file
+        real_scandir = os.scandir
+
+        class ReversedScandir:
+            """os.scandir stand-in listing entries in reverse name order."""
+            def __init__(self, path):
+                with real_scandir(path) as entries:
+                    self._entries = sorted(entries, key=lambda e: e.name, reverse=True)
+            def __enter__(self):
+                return iter(self._entries)
+            def __exit__(self, *exc):
+                return False
+
+        monkeypatch.setattr('src.platforms.wechat.media_uploader.os.scandir', ReversedScandir)
+        uploader = WeChatMediaUploader(mock_wechat_client)
+
+        assert uploader._first_file_in(cover_dir) == cover_dir / "a_cover.jpg"
+
+    def test_cover_fallback_fails_on_empty_cover_dir(self, mock_wechat_client, mock_settings, sample_article_no_cover_ref):
+        """Test the fallback reports failure instead of raising when no cover file exists."""
+        for cover in mock_settings.INPUT_COVER_IMAGE_DIR.iterdir():
+            cover.unlink()
+        uploader = WeChatMediaUploader(mock_wechat_client)
+
+        assert uploader.upload_article_media(sample_article_no_cover_ref) is False
+        mock_wechat_client.upload_media.assert_not_called()
+
+    def test_resolve_all_returns_only_uploadable_pairs(self, mock_wechat_client, mock_settings, sample_article_for_upload):
+        """Test already uploaded and remote media are not pending, and missing files are not resolved."""
+        uploader = WeChatMediaUploader(mock_wechat_client)
+        sample_article_for_upload.get_placeholder_by_id("content_by_id.gif").uploaded_media_id = "done"
+        sample_article_for_upload.media_placeholders.append(
+            MediaPlaceholder(placeholder_id="web.png", media_type="image", file_path="https://example.com/web.png",
+                             original_tag="![Web](https://example.com/web.png)")
+        )
+
+        pending = uploader._pending_placeholders(sample_article_for_upload)
+        assert [p.placeholder_id for p in pending] == ["standard_img.png", "missing_file.bmp"]
+
+        resolved = uploader._resolve_all(pending)
+        assert [(p.placeholder_id, path.name) for p, path in resolved] == [("standard_img.png", "standard_img.png")]
+        mock_wechat_client.upload_media.assert_not_called()
+
+    def test_media_dirs_rebound_from_settings_each_run(self, mock_wechat_client, mock_settings, sample_article_for_upload, tmp_path, monkeypatch):
+        """Test a content directory changed in settings after construction is used by the next run."""
+        uploader = WeChatMediaUploader(mock_wechat_client)
+        moved_content_dir = tmp_path / "moved_content"
+        moved_content_dir.mkdir()
+        (moved_content_dir / "missing_file.bmp").write_bytes(b"moved")
+        monkeypatch.setattr(mock_settings, 'INPUT_CONTENT_IMAGE_DIR', moved_content_dir)
+
+        assert uploader.upload_article_media(sample_article_for_upload) is True
+        missing = sample_article_for_upload.get_placeholder_by_id("missing_file.bmp")
+        assert missing.uploaded_media_id == "perm_id_for_missing_file.bmp"
+
+    def test_relative_media_path_normalized(self, mock_wechat_client, mock_settings, sample_article_for_upload):
+        """Test '..' segments in a Markdown media path are collapsed before the file is looked up."""
+        uploader = WeChatMediaUploader(mock_wechat_client)
+        placeholder = sample_article_for_upload.get_placeholder_by_id("standard_img.png")
+        placeholder.file_path = "rel_content/../rel_content/./standard_img.png"
+
+        assert uploader._find_media_file(placeholder) == mock_settings.INPUT_DIR / "rel_content" / "standard_img.png"
+
+    def test_path_placeholder_falls_back_to_filename_in_content_dir(self, mock_wechat_client, mock_settings):
+        """Test a standard link whose relative path misses still finds the same-named file in the content dir."""
+        (mock_settings.INPUT_CONTENT_IMAGE_DIR / "x.png").write_bytes(b"x")
+        placeholder = MediaPlaceholder(placeholder_id="img/x.png", media_type="image", file_path="img/x.png", original_tag="")
+        uploader = WeChatMediaUploader(mock_wechat_client)
+
+        assert uploader._find_media_file(placeholder) == mock_settings.INPUT_CONTENT_IMAGE_DIR / "x.png"
+
+    def test_identical_content_uploaded_once(self, mock_wechat_client, mock_settings, sample_article_for_upload):
+        """Test files with identical bytes share one upload (per media type), across articles too."""
+        uploader = WeChatMediaUploader(mock_wechat_client)
+        (mock_settings.INPUT_CONTENT_IMAGE_DIR / "copy_of_standard.png").write_bytes(b"standard-img")
+        sample_article_for_upload.media_placeholders.append(
+            MediaPlaceholder(placeholder_id="copy_of_standard.png", media_type="image", original_tag="![Copy](placeholder:copy_of_standard.png)")
+        )
+
+        assert uploader.upload_article_media(sample_article_for_upload) is True
+
+        copy = sample_article_for_upload.get_placeholder_by_id("copy_of_standard.png")
+        assert copy.uploaded_media_id == "perm_id_for_standard_img.png"
+        assert mock_wechat_client.upload_media.call_count == 3  # cover + 2 distinct content files
+
+        # A second article with the same media needs no new uploads
+        for placeholder in sample_article_for_upload.media_placeholders:
+            placeholder.uploaded_media_id = None
+        sample_article_for_upload.cover_image_placeholder.uploaded_media_id = None
+        assert uploader.upload_article_media(sample_article_for_upload) is True
+        assert mock_wechat_client.upload_media.call_count == 3
+
+    def test_clear_cache_forces_reupload(self, mock_wechat_client, mock_settings, sample_article_for_upload):
+        """Test clear_cache drops earlier upload results, so the same media is uploaded again."""
+        uploader = WeChatMediaUploader(mock_wechat_client)
+        assert uploader.upload_article_media(sample_article_for_upload) is True
+        assert mock_wechat_client.upload_media.call_count == 3
+
+        for placeholder in sample_article_for_upload.media_placeholders:
+            placeholder.uploaded_media_id = None
+        sample_article_for_upload.cover_image_placeholder.uploaded_media_id = None
+        uploader.clear_cache()
+        assert uploader.upload_article_media(sample_article_for_upload) is True
+        assert mock_wechat_client.upload_media.call_count == 6
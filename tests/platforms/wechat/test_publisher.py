@@ -1,10 +1,13 @@
 # /Users/junluo/Documents/auto_work_publishment_for_wechat_article/tests/platforms/wechat/test_publisher.py
 
+import html
+import logging
 import pytest
+import time
 from unittest.mock import MagicMock, call, ANY # ANY can match arguments flexibly
 
 from src.core.article_model import Article, MediaPlaceholder, ContentElement
-from src.platforms.wechat.publisher import WeChatPublisher
+from src.platforms.wechat.publisher import WeChatPublisher, HTML_WRAPPER_TEMPLATE, MAX_SUMMARY_LENGTH, _escape_html, _RateLimiter
 # Assuming WeChatClient/DeepSeekClient are accessible for type hinting/mocking
 # from src.api.wechat.client import WeChatClient
 # from src.api.deepseek.deepseek_api import DeepSeekClient
@@ -26,7 +29,7 @@ def mock_wechat_client(mocker):
 @pytest.fixture
 def mock_deepseek_client(mocker):
     """Fixture for a mocked DeepSeekClient."""
-    mock_client = MagicMock(spec=['generate_summary', 'get_content_as_text']) # Added get_content_as_text to spec if needed for mocking
+    mock_client = MagicMock(spec=['generate_summary', 'generate_summaries_batch', 'get_content_as_text']) # Added get_content_as_text to spec if needed for mocking
     mock_client.generate_summary.return_value = "Generated test summary."
     # If you need to mock Article.get_content_as_text behavior you might do it here or on the article object directly
     return mock_client
@@ -206,6 +209,150 @@ class TestWeChatPublisher:
          assert payload['need_open_comment'] == (1 if mock_settings.ENABLE_COMMENTS else 0)
 
 
+    def test_publish_drafts_batches_missing_summaries(self, mock_wechat_client, mock_deepseek_client, mock_settings, processed_article, mocker):
+        """Test publish_drafts asks DeepSeek once for all missing summaries, then publishes each article."""
+        second_article = Article(
+            title="Second Article",
+            content_elements=[ContentElement(type='html', content="<p>Second body.</p>")],
+            media_placeholders=[],
+            cover_image_placeholder=MediaPlaceholder(placeholder_id="cover2.jpg", media_type="thumb",
+                                                     uploaded_media_id="cover_media_id_2", original_tag=""),
+        )
+        mocker.patch.object(second_article, 'get_content_as_text', return_value="Second body.")
+        summarized_article = Article(
+            title="Already Summarized",
+            content_elements=[ContentElement(type='html', content="<p>Third body.</p>")],
+            media_placeholders=[],
+            cover_image_placeholder=MediaPlaceholder(placeholder_id="cover3.jpg", media_type="thumb",
+                                                     uploaded_media_id="cover_media_id_3", original_tag=""),
+            summary="Existing summary.",
+        )
+        mock_deepseek_client.generate_summaries_batch.return_value = ["Batch summary 1.", "Batch summary 2."]
+        mock_wechat_client.add_draft.side_effect = lambda payload: f"draft_for_{payload['title']}"  # Drafts are saved concurrently
+        publisher = WeChatPublisher(mock_wechat_client, mock_deepseek_client)
+
+        results = publisher.publish_drafts([processed_article, second_article, summarized_article], check_existing=False)
+
+        assert results == ["draft_for_Publish Test Article", "draft_for_Second Article", "draft_for_Already Summarized"]
+        mock_deepseek_client.generate_summaries_batch.assert_called_once_with([processed_article.get_content_as_text.return_value, "Second body."])
+        mock_deepseek_client.generate_summary.assert_not_called()
+        digests = {c[0][0]['title']: c[0][0]['digest'] for c in mock_wechat_client.add_draft.call_args_list}
+        assert digests == {"Publish Test Article": "Batch summary 1.", "Second Article": "Batch summary 2.", "Already Summarized": "Existing summary."}
+
+    def test_publish_drafts_skips_unprepared_articles(self, mock_wechat_client, mock_settings, processed_article):
+        """Test an article that cannot be prepared (no cover media ID) yields None without blocking the rest."""
+        broken_article = Article(title="No Cover", content_elements=[ContentElement(type='html', content="<p>x</p>")],
+                                 media_placeholders=[], summary="s")
+        publisher = WeChatPublisher(mock_wechat_client)
+
+        results = publisher.publish_drafts([broken_article, processed_article], check_existing=False)
+
+        assert results == [None, "new_draft_media_id_123"]
+        mock_wechat_client.add_draft.assert_called_once()
+
+    def test_publish_drafts_same_title_creates_one_draft(self, mock_wechat_client, mock_settings, processed_article):
+        """Test two same-title articles published concurrently give one new draft, which the second updates."""
+        duplicate_article = Article(
+            title=processed_article.title,
+            content_elements=[ContentElement(type='html', content="<p>Revised body.</p>")],
+            media_placeholders=[],
+            cover_image_placeholder=processed_article.cover_image_placeholder,
+            summary="Revised summary.",
+        )
+
+        def slow_find(title):
+            time.sleep(0.05)  # Widen the find-then-create window so both workers would overlap in it
+            return None
+
+        mock_wechat_client.find_draft_by_title.side_effect = slow_find
+        publisher = WeChatPublisher(mock_wechat_client)
+
+        results = publisher.publish_drafts([processed_article, duplicate_article], check_existing=True)
+
+        assert results == ["new_draft_media_id_123", "new_draft_media_id_123"]
+        mock_wechat_client.find_draft_by_title.assert_called_once_with(processed_article.title)
+        mock_wechat_client.add_draft.assert_called_once()
+        mock_wechat_client.update_draft.assert_called_once_with(
+            draft_media_id="new_draft_media_id_123", article_index=0, article_data=ANY
+        )
+
+    def test_publish_caches_draft_lookup_by_title(self, mock_wechat_client, mock_deepseek_client, mock_settings, processed_article):
+        """Test the draft list is searched once per title, and a draft created earlier is updated on republish."""
+        publisher = WeChatPublisher(mock_wechat_client, mock_deepseek_client)
+
+        assert publisher.publish_draft(processed_article, check_existing=True) == "new_draft_media_id_123"
+        assert publisher.publish_draft(processed_article, check_existing=True) == "new_draft_media_id_123"
+
+        mock_wechat_client.find_draft_by_title.assert_called_once_with(processed_article.title)
+        mock_wechat_client.add_draft.assert_called_once()
+        mock_wechat_client.update_draft.assert_called_once_with(
+            draft_media_id="new_draft_media_id_123", article_index=0, article_data=ANY
+        )
+
+    def test_publish_uses_defaults_read_at_init_until_refresh(self, mock_wechat_client, mock_settings, processed_article):
+        """Test payload defaults come from settings as of __init__, and refresh() re-reads them."""
+        publisher = WeChatPublisher(mock_wechat_client)
+        mock_settings.ARTICLE_AUTHOR = "Changed Author"
+        mock_settings.ENABLE_COMMENTS = True
+
+        publisher.publish_draft(processed_article, check_existing=False)
+        payload = mock_wechat_client.add_draft.call_args[0][0]
+        assert payload['author'] == "Publisher Default Author"
+        assert payload['need_open_comment'] == 0
+        assert payload['is_original'] == 1
+
+        publisher.refresh()
+        publisher.publish_draft(processed_article, check_existing=False)
+        payload = mock_wechat_client.add_draft.call_args[0][0]
+        assert payload['author'] == "Changed Author"
+        assert payload['need_open_comment'] == 1
+
+    def test_publish_failed_update_evicts_cached_draft_id(self, mock_wechat_client, mock_settings, processed_article):
+        """Test a failed update forgets the cached media_id, so the retry lists drafts again and creates one."""
+        mock_wechat_client.find_draft_by_title.side_effect = ["deleted_draft_id", None]
+        mock_wechat_client.update_draft.return_value = False # Draft was deleted on the server
+        publisher = WeChatPublisher(mock_wechat_client)
+
+        assert publisher.publish_draft(processed_article, check_existing=True) is None
+        assert publisher.publish_draft(processed_article, check_existing=True) == "new_draft_media_id_123"
+
+        mock_wechat_client.update_draft.assert_called_once_with(
+            draft_media_id="deleted_draft_id", article_index=0, article_data=ANY
+        )
+        assert mock_wechat_client.find_draft_by_title.call_count == 2
+        mock_wechat_client.add_draft.assert_called_once()
+
+    def test_publish_update_exception_evicts_cached_draft_id(self, mock_wechat_client, mock_settings, processed_article):
+        """Test an unexpected error while updating also drops the cached media_id."""
+        mock_wechat_client.find_draft_by_title.side_effect = ["stale_draft_id", None]
+        mock_wechat_client.update_draft.side_effect = RuntimeError("boom")
+        publisher = WeChatPublisher(mock_wechat_client)
+
+        assert publisher.publish_draft(processed_article, check_existing=True) is None
+        assert publisher.publish_draft(processed_article, check_existing=True) == "new_draft_media_id_123"
+        assert mock_wechat_client.find_draft_by_title.call_count == 2
+
+    def test_publish_truncates_long_summary(self, mock_wechat_client, mock_settings, processed_article):
+        """Test a summary longer than the digest limit is cut to MAX_SUMMARY_LENGTH characters."""
+        processed_article.summary = "x" * (MAX_SUMMARY_LENGTH + 30)
+        publisher = WeChatPublisher(mock_wechat_client)
+
+        publisher.publish_draft(processed_article, check_existing=False)
+
+        assert mock_wechat_client.add_draft.call_args[0][0]['digest'] == "x" * MAX_SUMMARY_LENGTH
+
+    def test_publish_logs_summary_as_single_record(self, mock_wechat_client, mock_settings, processed_article, caplog):
+        """Test the publication summary is emitted as one multi-line log record."""
+        publisher = WeChatPublisher(mock_wechat_client)
+
+        with caplog.at_level(logging.INFO, logger='wechat_publisher'):
+            publisher.publish_draft(processed_article, check_existing=False)
+
+        summaries = [r for r in caplog.records if "Draft Publication Summary" in r.getMessage()]
+        assert len(summaries) == 1
+        assert "Draft Media ID: new_draft_media_id_123" in summaries[0].getMessage()
+        assert not any(r.getMessage().startswith("  Operation Status") for r in caplog.records)
+
     def test_publish_fail_no_cover_media_id(self, mock_wechat_client, mock_deepseek_client, mock_settings, processed_article):
         """Test failure if the cover image media ID is missing."""
         processed_article.cover_image_placeholder.uploaded_media_id = None # Simulate missing ID
@@ -251,4 +398,116 @@ class TestWeChatPublisher:
          assert draft_media_id is None # Should fail if update fails
          mock_wechat_client.find_draft_by_title.assert_called_once()
          mock_wechat_client.update_draft.assert_called_once() # Verify it was called
-         mock_wechat_client.add_draft.assert_not_called()
\ No newline at end of file
+         mock_wechat_client.add_draft.assert_not_called()
+
+    def test_publish_retry_reuses_assembled_html(self, mock_wechat_client, mock_deepseek_client, mock_settings, processed_article, mocker):
+         """Test that a second publish of a fully resolved article does not re-assemble the HTML."""
+         processed_article.get_placeholder_by_id("img_no_url.gif").uploaded_url = "http://wx.com/img_no_url.gif"
+         mock_wechat_client.add_draft.side_effect = [None, "new_draft_media_id_123"] # Fail first, succeed on retry
+         publisher = WeChatPublisher(mock_wechat_client, mock_deepseek_client)
+         assemble_spy = mocker.spy(publisher, '_assemble_html_content')
+
+         assert publisher.publish_draft(processed_article, check_existing=False) is None
+         assert publisher.publish_draft(processed_article, check_existing=False) == "new_draft_media_id_123"
+
+         assemble_spy.assert_called_once_with(processed_article, [])
+         first_payload = mock_wechat_client.add_draft.call_args_list[0][0][0]
+         second_payload = mock_wechat_client.add_draft.call_args_list[1][0][0]
+         assert second_payload['content'] == first_payload['content']
+
+    def test_publish_retry_reassembles_html_with_unresolved_media(self, mock_wechat_client, mock_settings, processed_article):
+         """Test HTML that dropped an img tag is not cached, so a retry after re-uploading includes the image."""
+         mock_wechat_client.add_draft.side_effect = [None, "new_draft_media_id_123"]
+         publisher = WeChatPublisher(mock_wechat_client)
+
+         assert publisher.publish_draft(processed_article, check_existing=False) is None
+         first_content = mock_wechat_client.add_draft.call_args_list[0][0][0]['content']
+         assert "img_no_url.gif" not in first_content
+         assert processed_article.final_html_content is None
+
+         processed_article.get_placeholder_by_id("img_no_url.gif").uploaded_url = "http://wx.com/img_no_url.gif"
+         assert publisher.publish_draft(processed_article, check_existing=False) == "new_draft_media_id_123"
+
+         second_content = mock_wechat_client.add_draft.call_args_list[1][0][0]['content']
+         assert 'src="http://wx.com/img_no_url.gif"' in second_content
+         assert processed_article.final_html_content == second_content
+
+    def test_assemble_html_escapes_title(self, mock_wechat_client, mock_settings, processed_article):
+        """Test the article title is HTML-escaped inside the <title> element."""
+        processed_article.title = 'Tips & <Tricks> "Quoted"'
+        publisher = WeChatPublisher(mock_wechat_client)
+
+        full_html = publisher._assemble_html_content(processed_article)
+
+        assert "<title>Tips &amp; &lt;Tricks&gt; &quot;Quoted&quot;</title>" in full_html
+
+    def test_assemble_html_first_duplicate_placeholder_wins(self, mock_wechat_client, mock_settings, processed_article):
+        """Test placeholder lookup keeps get_placeholder_by_id precedence (first content match, then cover)."""
+        processed_article.media_placeholders.append(
+            MediaPlaceholder(placeholder_id="img1.png", media_type="image", uploaded_url="http://wx.com/duplicate.png", original_tag="")
+        )
+        processed_article.cover_image_placeholder.uploaded_url = "http://wx.com/cover.jpg"
+        processed_article.content_elements[0].content += '<img src="placeholder:cover.jpg">'
+        publisher = WeChatPublisher(mock_wechat_client)
+
+        full_html = publisher._assemble_html_content(processed_article)
+
+        assert 'src="http://wx.com/img1.png"' in full_html
+        assert "duplicate.png" not in full_html
+        assert 'src="http://wx.com/cover.jpg"' in full_html
+
+    def test_assemble_html_placeholder_match_stays_within_tag(self, mock_wechat_client, mock_settings, processed_article):
+        """Test a plain <img> before a placeholder is left intact and non-ASCII IDs still resolve."""
+        processed_article.media_placeholders.append(
+            MediaPlaceholder(placeholder_id="图片.png", media_type="image", uploaded_url="http://wx.com/cn.png", original_tag="")
+        )
+        processed_article.content_elements[0].content = (
+            '<img alt="logo" src="http://example.com/logo.png"><p>x</p><IMG class="c" src=\'placeholder:图片.png\' />'
+        )
+        publisher = WeChatPublisher(mock_wechat_client)
+
+        full_html = publisher._assemble_html_content(processed_article)
+
+        assert '<img alt="logo" src="http://example.com/logo.png"><p>x</p>' in full_html
+        assert '<IMG class="c" src=\'http://wx.com/cn.png\' />' in full_html
+
+    def test_assemble_html_without_placeholders_skips_regex(self, mock_wechat_client, mock_settings, processed_article, mocker):
+        """Test HTML with no placeholder references is wrapped as-is without running the replacement regex."""
+        processed_article.content_elements[0].content = '<p>Text only, <img src="http://example.com/a.png"></p>'
+        placeholder_re = mocker.patch('src.platforms.wechat.publisher.HTML_PLACEHOLDER_SRC_RE')
+        publisher = WeChatPublisher(mock_wechat_client)
+
+        full_html = publisher._assemble_html_content(processed_article)
+
+        assert '<p>Text only, <img src="http://example.com/a.png"></p>' in full_html
+        placeholder_re.sub.assert_not_called()
+
+    def test_assemble_html_matches_wrapper_template(self, mock_wechat_client, mock_settings, processed_article):
+        """Test the pre-split wrapper yields exactly what formatting HTML_WRAPPER_TEMPLATE would."""
+        processed_article.content_elements[0].content = "<p>Body with {braces}</p>"
+        publisher = WeChatPublisher(mock_wechat_client)
+
+        full_html = publisher._assemble_html_content(processed_article)
+
+        assert full_html == HTML_WRAPPER_TEMPLATE.format(title=processed_article.title, content="<p>Body with {braces}</p>")
+
+
+def test_escape_html_returns_safe_text_unchanged():
+    """Text without HTML-special characters is returned as the same object."""
+    text = "Plain article title"
+    assert _escape_html(text) is text
+    assert _escape_html("a<b") == "a&lt;b"
+    assert _escape_html("R&D's \"<x>\"") == html.escape("R&D's \"<x>\"")
+
+
+def test_rate_limiter_spaces_calls(mocker):
+    """Calls are handed consecutive slots 1/rate apart; the first call does not wait."""
+    mocker.patch('src.platforms.wechat.publisher.time.monotonic', return_value=100.0)
+    sleep = mocker.patch('src.platforms.wechat.publisher.time.sleep')
+    limiter = _RateLimiter(rate_per_second=4)
+
+    limiter.wait()
+    limiter.wait()
+    limiter.wait()
+
+    assert sleep.call_args_list == [call(0.25), call(0.5)]
@@ -1,6 +1,7 @@
 # tests/test_main.py
 
 import pytest
+import subprocess
 import sys
 import logging
 from pathlib import Path
@@ -40,21 +41,21 @@ def mock_dependencies(mocker):
     mock_article.cover_image_placeholder = MagicMock()
     mock_article.cover_image_placeholder.uploaded_media_id = None
     mock_parser_instance.parse_file.return_value = mock_article
-    mock_parser_constructor = mocker.patch('src.main.MarkdownParser', return_value=mock_parser_instance)
+    mock_parser_constructor = mocker.patch('src.parsing.md_parser.MarkdownParser', return_value=mock_parser_instance)
 
     mock_uploader_instance = MagicMock()
     mock_uploader_instance.upload_article_media.return_value = True
-    mock_uploader_constructor = mocker.patch('src.main.WeChatMediaUploader', return_value=mock_uploader_instance)
+    mock_uploader_constructor = mocker.patch('src.platforms.wechat.media_uploader.WeChatMediaUploader', return_value=mock_uploader_instance)
 
     mock_publisher_instance = MagicMock()
     mock_publisher_instance.publish_draft.return_value = "draft_media_id_123"
-    mock_publisher_constructor = mocker.patch('src.main.WeChatPublisher', return_value=mock_publisher_instance)
+    mock_publisher_constructor = mocker.patch('src.platforms.wechat.publisher.WeChatPublisher', return_value=mock_publisher_instance)
 
     mock_wechat_client_instance = MagicMock()
-    mock_wechat_client_constructor = mocker.patch('src.main.WeChatClient', return_value=mock_wechat_client_instance)
+    mock_wechat_client_constructor = mocker.patch('src.api.wechat.client.WeChatClient', return_value=mock_wechat_client_instance)
 
     mock_deepseek_client_instance = MagicMock()
-    mock_deepseek_client_constructor = mocker.patch('src.main.DeepSeekClient', return_value=mock_deepseek_client_instance)
+    mock_deepseek_client_constructor = mocker.patch('src.api.deepseek.deepseek_api.DeepSeekClient', return_value=mock_deepseek_client_instance)
 
     mocker.patch.object(settings, 'DEEPSEEK_API_KEY', 'dummy_key', create=True)
     mocker.patch.object(settings, 'MEDIA_HANDLING_MODE', 'upload', create=True)
@@ -194,6 +195,14 @@ class TestMainWorkflow:
         mock_dependencies["mock_publisher_instance"].publish_draft.assert_called_once()
         mock_dependencies["mock_logger"].error.assert_any_call("WeChat Auto Publisher Workflow Finished With Errors")
 
+    def test_main_sets_up_logging_once(self, mock_dependencies, mock_parsed_args, mocker):
+        """Test main attaches the log handlers itself (importing the logger module does not)."""
+        mock_setup_logger = mocker.patch('src.main.setup_logger')
+        mock_parsed_args(markdown_file="path/to/article.md")
+
+        assert self.run_main() == 0
+        mock_setup_logger.assert_called_once_with()
+
     @pytest.mark.parametrize(
             "level_arg, expected_level",
             [("DEBUG", logging.DEBUG), ("INFO", logging.INFO), ("WARNING", logging.WARNING), ("ERROR", logging.ERROR), ("CRITICAL", logging.CRITICAL),]
@@ -212,9 +221,9 @@ class TestMainWorkflow:
         # UPDATED Assertion: Check exit code
         assert self.run_main() == 0
 
-        # Check logger and handler levels were set
+        # Check the logger level was set; handlers defer to it and are left untouched
         mock_dependencies["mock_app_logger"].setLevel.assert_called_with(expected_level)
-        mock_dependencies["mock_handler"].setLevel.assert_called_with(expected_level)
+        mock_dependencies["mock_handler"].setLevel.assert_not_called()
         mock_dependencies["mock_logger"].info.assert_any_call(f"Logging level set to: {level_arg.upper()}")
 
     def test_main_invalid_log_level(self, mock_dependencies, mock_parsed_args, mocker):
@@ -305,4 +314,14 @@ class TestMainWorkflow:
         mock_dependencies["mock_deepseek_client_instance"].close_session.assert_not_called()
         mock_dependencies["mock_publisher_constructor"].assert_called_once_with(wechat_client=mock_dependencies["mock_wechat_client_instance"], deepseek_client=None)
         mock_dependencies["mock_publisher_instance"].publish_draft.assert_called_once()
-        mock_dependencies["mock_wechat_client_instance"].close_session.assert_called_once()
\ No newline at end of file
+        mock_dependencies["mock_wechat_client_instance"].close_session.assert_called_once()
+
+def test_main_import_defers_heavy_modules():
+    """Importing the CLI entry point must not load the HTTP/API stack (keeps `--help` fast)."""
+    project_root = Path(__file__).resolve().parent.parent
+    code = (
+        "import sys, src.main; "
+        "print(sorted(m for m in ('requests', 'openai', 'markdown', 'src.core.settings') if m in sys.modules))"
+    )
+    result = subprocess.run([sys.executable, "-c", code], cwd=project_root, capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == "[]"
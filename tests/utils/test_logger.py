@@ -1,6 +1,11 @@
 import logging
 import pytest
-from src.utils.logger import setup_logger, LOG_FORMAT, LOG_LEVEL
+from src.utils.logger import log, setup_logger, LOG_FORMAT, LOG_LEVEL, LOGGER_NAME
+
+def test_module_logger_is_app_logger():
+    """The importable `log` is the named application logger at the default level."""
+    assert log is logging.getLogger(LOGGER_NAME)
+    assert log.level == LOG_LEVEL
 
 def test_setup_logger_creation():
     """Test if setup_logger returns a Logger instance."""